@@ -6,7 +6,7 @@ router = APIRouter(tags=["AI"])
 
 
 @router.get("/ai/recipe")
-def generate_recipe(
+async def generate_recipe(
     ingredients: str = Query(
         ...,
         description="Comma-separated list of ingredients"
@@ -29,7 +29,7 @@ def generate_recipe(
     )
 
     try:
-        result = ask_gemini(prompt)
+        result = await ask_gemini(prompt)
         # NOTE: Keep the JSON keys for backward compatibility with the frontend
         return {"ingredients": ingredients, "recette": result}
     except Exception as e:
@@ -40,7 +40,7 @@ def generate_recipe(
 
 
 @router.get("/ai/ask")
-def ask_general(
+async def ask_general(
     question: str = Query(
         ...,
         description="Question to ask the AI"
@@ -53,7 +53,7 @@ def ask_general(
         /api/ai/ask?question=Explain quantum mechanics in simple terms
     """
     try:
-        result = ask_gemini(question)
+        result = await ask_gemini(question)
         # NOTE: Keep the JSON keys for backward compatibility with the frontend
         return {"question": question, "réponse": result}
     except Exception as e:
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select, delete, func, and_
 
 from app import models, schemas
+from app.crud import feasibility
 from app.utils.security import get_password_hash
 
 # ====================================================================
@@ -263,6 +264,9 @@ def check_inventory_for_recipe(
     """
     Compare l'inventaire de l'utilisateur avec les ingrédients requis
     par une recette et retourne les manquants / disponibles.
+
+    Utilise le même moteur que /recipes/check-inventory (unités converties,
+    lignes d'inventaire de même nom additionnées).
     """
 
     required_ingredients = db.scalars(
@@ -271,49 +275,6 @@ def check_inventory_for_recipe(
         )
     ).all()
 
-    user_inventory = db.scalars(
-        select(models.Ingredient).filter(
-            models.Ingredient.owner_id == user_id
-        )
-    ).all()
+    inventory = feasibility.load_inventory(db, user_id)
 
-    inventory_map: dict[tuple[str, str], float] = {}
-    for item in user_inventory:
-        key = (item.name.lower(), item.unit.lower())
-        inventory_map[key] = inventory_map.get(key, 0.0) + item.quantity
-
-    missing_items = []
-    available_items = []
-    can_make = True
-
-    for required in required_ingredients:
-        req_key = (required.name.lower(), required.unit.lower())
-        available_quantity = inventory_map.get(req_key, 0.0)
-        required_quantity = required.quantity
-
-        if available_quantity < required_quantity:
-            can_make = False
-            missing_items.append(
-                {
-                    "name": required.name,
-                    "required": required_quantity,
-                    "available": available_quantity,
-                    "unit": required.unit,
-                }
-            )
-        else:
-            available_items.append(
-                {
-                    "name": required.name,
-                    "needed": required_quantity,
-                    "available": available_quantity,
-                    "unit": required.unit,
-                }
-            )
-
-    return schemas.InventoryCheckResponse(
-        recipe_id=recipe_id,
-        can_make=can_make,
-        missing_items=missing_items,
-        available_items=available_items,
-    )
+    return feasibility.evaluate_recipe(recipe_id, required_ingredients, inventory)
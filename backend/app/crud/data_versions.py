@@ -0,0 +1,69 @@
+# app/crud/data_versions.py
+"""
+Version counters of the data behind the caches and ETags (models.DataVersion).
+
+Database triggers (database.SCHEMA_UPGRADES) bump them inside the writing
+transaction, once per transaction and scope. They are deferred constraint
+triggers, so the version row is only locked while the transaction commits:
+writers do not queue behind each other's open transactions, and the lock
+never interleaves with the other locks a write takes.
+
+Scopes, one row per owner (no row shared by every writer):
+- ("inventory", owner_id): a user's ingredients;
+- ("recipes", owner_id): a user's recipes and their ingredients, public or not;
+- ("public", owner_id): a user's public recipes. The version of the public
+  catalog is the sum over owners, which only grows with each commit.
+
+A reader only sees a new version together with the committed data behind it,
+so data read after a version can never be older than that version.
+"""
+from typing import Optional, Tuple
+
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+INVENTORY = "inventory"
+RECIPES = "recipes"
+PUBLIC = "public"
+
+
+def _version(scope: str, owner_id: int):
+    version = models.DataVersion
+    return (
+        select(version.version)
+        .filter(version.scope == scope, version.owner_id == owner_id)
+        .scalar_subquery()
+    )
+
+
+def _public_version():
+    version = models.DataVersion
+    return (
+        select(cast(func.coalesce(func.sum(version.version), 0), BigInteger))
+        .filter(version.scope == PUBLIC)
+        .scalar_subquery()
+    )
+
+
+def public_version(db: Session) -> int:
+    """Version of the public recipe catalog."""
+    return db.scalar(select(_public_version())) or 0
+
+
+def catalog_versions(db: Session, user_id: Optional[int]) -> Tuple[int, int]:
+    """(version of the user's own recipes, public version): the recipes they can see."""
+    if user_id is None:
+        return 0, public_version(db)
+    row = db.execute(select(_version(RECIPES, user_id), _public_version())).one()
+    return row[0] or 0, row[1] or 0
+
+
+def user_versions(db: Session, user_id: int) -> Tuple[int, Tuple[int, int]]:
+    """(inventory version, catalog_versions()) in a single round-trip."""
+    row = db.execute(
+        select(_version(INVENTORY, user_id), _version(RECIPES, user_id), _public_version())
+    ).one()
+    return row[0] or 0, (row[1] or 0, row[2] or 0)
+
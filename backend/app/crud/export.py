@@ -0,0 +1,222 @@
+# app/crud/export.py
+"""
+Streaming export of a user's data (GET /export).
+
+Every section is read through a server-side cursor (`yield_per`): rows are
+fetched from PostgreSQL YIELD_PER at a time and turned into output as they
+arrive, so memory stays flat whatever the size of the account. Parents and
+their children (recipe -> ingredients, list -> items) come from one ordered
+LEFT JOIN and are grouped on the fly, without a query per parent.
+
+The whole export reads one REPEATABLE READ snapshot, so the sections are
+consistent with each other even if the user writes meanwhile.
+
+Formats:
+- ndjson: one JSON object per line with a "type" field; recipe lines are
+  valid POST /recipes/bulk input (extra fields are ignored there);
+- csv: one flat row per record, children carry their parent id in
+  "parent_id"; "name" holds the recipe title / ingredient name / item name.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterator, List, Literal
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import SessionLocal
+
+ExportFormat = Literal["ndjson", "csv"]
+
+YIELD_PER = 1000
+# Output is sent in chunks of about this size rather than line by line
+CHUNK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+RECIPE_COLUMNS = (
+    "id", "title", "description", "instructions", "prep_time", "cook_time",
+    "servings", "calories", "is_healthy", "is_public", "created_at", "updated_at",
+)
+RECIPE_INGREDIENT_COLUMNS = ("id", "name", "quantity", "unit", "catalog_id")
+INGREDIENT_COLUMNS = (
+    "id", "name", "category", "location", "quantity", "unit", "expiry_date",
+    "catalog_id", "created_at", "updated_at",
+)
+SHOPPING_LIST_COLUMNS = ("id", "name", "created_at", "updated_at")
+SHOPPING_ITEM_COLUMNS = (
+    "id", "item_name", "quantity", "unit", "is_purchased", "catalog_id",
+    "created_at", "updated_at",
+)
+
+CSV_FIELDS = (
+    "type", "id", "parent_id", "name", "quantity", "unit", "catalog_id",
+    "category", "location", "expiry_date", "is_purchased", "description",
+    "instructions", "prep_time", "cook_time", "servings", "calories",
+    "is_healthy", "is_public", "created_at", "updated_at",
+)
+
+
+def _columns(model, names) -> List[Any]:
+    return [getattr(model, name).label(f"{model.__tablename__}_{name}") for name in names]
+
+
+def _values(row, model, names) -> Dict[str, Any]:
+    mapping = row._mapping
+    return {name: mapping[f"{model.__tablename__}_{name}"] for name in names}
+
+
+def _grouped(
+    db: Session,
+    parent, parent_columns,
+    child, child_columns,
+    join_on, owner_filter,
+    record_type: str, children_key: str,
+) -> Iterator[Dict[str, Any]]:
+    """Parent records with their children nested, from one streamed join."""
+    stmt = (
+        select(*_columns(parent, parent_columns), *_columns(child, child_columns))
+        .outerjoin(child, join_on)
+        .where(owner_filter)
+        .order_by(parent.id, child.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    current = None
+    for row in db.execute(stmt):
+        parent_id = row._mapping[f"{parent.__tablename__}_id"]
+        if current is None or current["id"] != parent_id:
+            if current is not None:
+                yield current
+            current = {"type": record_type, **_values(row, parent, parent_columns), children_key: []}
+        child_values = _values(row, child, child_columns)
+        if child_values["id"] is not None:
+            current[children_key].append(child_values)
+    if current is not None:
+        yield current
+
+
+def iter_records(db: Session, user_id: int) -> Iterator[Dict[str, Any]]:
+    """Recipes, then inventory ingredients, then shopping lists of `user_id`."""
+    yield from _grouped(
+        db,
+        models.Recipe, RECIPE_COLUMNS,
+        models.RecipeIngredient, RECIPE_INGREDIENT_COLUMNS,
+        models.RecipeIngredient.recipe_id == models.Recipe.id,
+        models.Recipe.owner_id == user_id,
+        "recipe", "required_ingredients",
+    )
+
+    stmt = (
+        select(*_columns(models.Ingredient, INGREDIENT_COLUMNS))
+        .where(models.Ingredient.owner_id == user_id)
+        .order_by(models.Ingredient.id)
+        .execution_options(yield_per=YIELD_PER)
+    )
+    for row in db.execute(stmt):
+        yield {"type": "ingredient", **_values(row, models.Ingredient, INGREDIENT_COLUMNS)}
+
+    yield from _grouped(
+        db,
+        models.ShoppingList, SHOPPING_LIST_COLUMNS,
+        models.ShoppingItem, SHOPPING_ITEM_COLUMNS,
+        models.ShoppingItem.shopping_list_id == models.ShoppingList.id,
+        models.ShoppingList.owner_id == user_id,
+        "shopping_list", "items",
+    )
+
+
+# ====================================================================
+# ENCODERS
+# ====================================================================
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot export {type(value).__name__}")
+
+
+def _ndjson_lines(records: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def _csv_rows(record: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    record_type = record["type"]
+    if record_type == "recipe":
+        children = record.pop("required_ingredients")
+        yield {**record, "name": record.pop("title")}
+        for child in children:
+            yield {"type": "recipe_ingredient", "parent_id": record["id"], **child}
+    elif record_type == "shopping_list":
+        children = record.pop("items")
+        yield record
+        for child in children:
+            yield {
+                "type": "shopping_item",
+                "parent_id": record["id"],
+                "name": child.pop("item_name"),
+                **child,
+            }
+    else:
+        yield record
+
+
+def _csv_lines(records: Iterator[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction="ignore")
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writeheader()
+    yield flush()
+    for record in records:
+        for row in _csv_rows(record):
+            writer.writerow(
+                {
+                    key: value.isoformat() if isinstance(value, (datetime, date)) else value
+                    for key, value in row.items()
+                }
+            )
+        yield flush()
+
+
+ENCODERS: Dict[str, Callable[[Iterator[Dict[str, Any]]], Iterator[str]]] = {
+    "ndjson": _ndjson_lines,
+    "csv": _csv_lines,
+}
+
+
+def stream_export(user_id: int, export_format: ExportFormat) -> Iterator[bytes]:
+    """
+    Encoded export of `user_id`, in chunks of about CHUNK_BYTES.
+
+    Opens its own session: the generator outlives the request handler (it is
+    consumed by the StreamingResponse), and the session is closed when the
+    stream ends or the client goes away.
+    """
+    db = SessionLocal()
+    try:
+        db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        chunk: List[bytes] = []
+        size = 0
+        for text in ENCODERS[export_format](iter_records(db, user_id)):
+            data = text.encode("utf-8")
+            chunk.append(data)
+            size += len(data)
+            if size >= CHUNK_BYTES:
+                yield b"".join(chunk)
+                chunk, size = [], 0
+        if chunk:
+            yield b"".join(chunk)
+    finally:
+        db.close()
@@ -0,0 +1,516 @@
+# app/crud/feasibility.py
+"""
+Inventory feasibility engine ("which recipes can I cook right now?").
+
+Ingredients are matched on their global catalog id (see
+crud/ingredient_catalog.py). The `ix_recipe_ingredients_catalog_id` index acts
+as an inverted index (catalog ingredient -> recipe ids): only recipes sharing
+at least one ingredient with the user's inventory are considered, and their
+required ingredients are batch-loaded in a single query. A full check costs a
+constant number of queries, whatever the size of the catalog.
+"""
+import base64
+import heapq
+import json
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, literal_column, or_, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.utils import units
+
+# Ranking ("cook now"): score = coverage and expiry urgency, both in [0, 1]
+COVERAGE_WEIGHT = 0.7
+URGENCY_WEIGHT = 0.3
+URGENCY_HORIZON_DAYS = 7  # items expiring later than this are not urgent
+
+# Tolerance for float conversions (1 lb = 453.59237 g ...)
+QUANTITY_EPSILON = 1e-6
+
+
+# ====================================================================
+# HELPERS
+# ====================================================================
+
+def accessible_recipes_clause(user_id: int):
+    """Visibility rule: recipes owned by the user OR public recipes."""
+    return or_(
+        models.Recipe.owner_id == user_id,
+        models.Recipe.is_public == True,  # noqa: E712
+    )
+
+
+def base_amount(row) -> Tuple[float, str]:
+    """(base_quantity, base_unit) of an Ingredient / RecipeIngredient row."""
+    if row.base_unit is not None and row.base_quantity is not None:
+        return row.base_quantity, row.base_unit
+    # Legacy row written before normalization: convert on the fly
+    return units.to_base(row.quantity, row.unit)
+
+
+class Inventory:
+    """
+    A user's inventory aggregated by (catalog id, base unit).
+
+    Several rows for the same ingredient (e.g. two packs of chicken, or
+    "Tomato" and "tomatoes") are summed instead of the last one silently
+    winning. Rows without a catalog id (blank name) are ignored.
+    """
+
+    def __init__(self, rows: Iterable[models.Ingredient]):
+        self.quantities: Dict[Tuple[int, str], float] = defaultdict(float)
+        self.units: Dict[int, Set[str]] = defaultdict(set)
+        self.expiry: Dict[int, date] = {}
+
+        for row in rows:
+            key = row.catalog_id
+            if key is None:
+                continue
+            quantity, unit = base_amount(row)
+            self.quantities[(key, unit)] += quantity
+            self.units[key].add(unit)
+            if row.expiry_date and (
+                key not in self.expiry or row.expiry_date < self.expiry[key]
+            ):
+                self.expiry[key] = row.expiry_date
+
+    def keys(self) -> Set[int]:
+        return set(self.units)
+
+    def has(self, key: Optional[int]) -> bool:
+        return key in self.units
+
+    def available(self, key: int, base_unit: str) -> float:
+        return self.quantities.get((key, base_unit), 0.0)
+
+
+def load_inventory(db: Session, user_id: int) -> Inventory:
+    """Return the user's aggregated inventory (one query)."""
+    return Inventory(
+        db.scalars(
+            select(models.Ingredient).filter(models.Ingredient.owner_id == user_id)
+        ).all()
+    )
+
+
+def load_recipe_ingredients(
+    db: Session, recipe_ids
+) -> Dict[int, List[models.RecipeIngredient]]:
+    """
+    Required ingredients of the given recipes grouped by recipe_id (one query).
+    `recipe_ids` may be a list or a SELECT of ids.
+    """
+    rows = db.scalars(
+        select(models.RecipeIngredient)
+        .filter(models.RecipeIngredient.recipe_id.in_(recipe_ids))
+        .order_by(models.RecipeIngredient.recipe_id, models.RecipeIngredient.id)
+    ).all()
+
+    grouped: Dict[int, List[models.RecipeIngredient]] = defaultdict(list)
+    for row in rows:
+        grouped[row.recipe_id].append(row)
+    return grouped
+
+
+def load_candidate_ingredients(
+    db: Session, user_id: int, keys: Iterable[int], private_only: bool = False
+) -> Dict[int, List[models.RecipeIngredient]]:
+    """
+    Return the required ingredients of every accessible recipe that uses at
+    least one of the catalog ids `keys`, grouped by recipe_id (one query).
+    With `private_only`, only the user's non-public recipes are considered.
+    """
+    keys = list(keys)
+    if not keys:
+        return {}
+
+    if private_only:
+        visibility = (models.Recipe.owner_id == user_id) & models.Recipe.is_public.isnot(True)
+    else:
+        visibility = accessible_recipes_clause(user_id)
+
+    candidate_ids = (
+        select(models.RecipeIngredient.recipe_id)
+        .join(models.Recipe, models.Recipe.id == models.RecipeIngredient.recipe_id)
+        .filter(
+            models.RecipeIngredient.catalog_id.in_(keys),
+            visibility,
+        )
+        .distinct()
+    )
+    return load_recipe_ingredients(db, candidate_ids)
+
+
+# ====================================================================
+# EVALUATION
+# ====================================================================
+
+def evaluate_recipe(
+    recipe_id: int,
+    required_ingredients: Iterable[models.RecipeIngredient],
+    inventory: Inventory,
+) -> schemas.InventoryCheckResponse:
+    """
+    Compare one recipe's required ingredients against the inventory.
+    Quantities are compared in base units; they are reported in the unit
+    used by the recipe.
+    """
+    can_make = True
+    missing_items = []
+    available_items = []
+
+    for req_ing in required_ingredients:
+        key = req_ing.catalog_id
+        req_quantity, req_unit = base_amount(req_ing)
+
+        # Context for the required ingredient (dict format for the response schema)
+        req_data = {
+            "name": req_ing.name,
+            "quantity": req_ing.quantity,
+            "unit": req_ing.unit,
+        }
+
+        if not inventory.has(key):
+            # Required ingredient not found
+            can_make = False
+            missing_items.append({**req_data, "reason": "Missing entirely"})
+            continue
+
+        available = inventory.available(key, req_unit)
+        if available + QUANTITY_EPSILON >= req_quantity:
+            available_items.append(
+                {
+                    "name": req_ing.name,
+                    "quantity": units.from_base(available, req_ing.unit),
+                    "unit": req_ing.unit,
+                }
+            )
+        elif req_unit in inventory.units[key]:
+            can_make = False
+            missing_items.append(
+                {
+                    **req_data,
+                    "available_quantity": units.from_base(available, req_ing.unit),
+                    "available_unit": req_ing.unit,
+                    "reason": "Insufficient quantity",
+                }
+            )
+        else:
+            # Only incompatible units in stock (e.g. "pcs" vs "g")
+            can_make = False
+            stock_unit = sorted(inventory.units[key])[0]
+            missing_items.append(
+                {
+                    **req_data,
+                    "available_quantity": inventory.available(key, stock_unit),
+                    "available_unit": stock_unit,
+                    "reason": "Unit mismatch",
+                }
+            )
+
+    return schemas.InventoryCheckResponse(
+        recipe_id=recipe_id,
+        can_make=can_make,
+        missing_items=missing_items,
+        available_items=available_items,
+    )
+
+
+def check_feasibility(
+    db: Session, user_id: int
+) -> List[schemas.InventoryCheckResponse]:
+    """
+    Evaluate every accessible recipe sharing at least one ingredient with the
+    user's inventory. Recipes with no overlap cannot be made and are skipped;
+    so are recipes without any required ingredient, which no inventory key
+    can reach (they used to come back with can_make=True).
+    """
+    inventory = load_inventory(db, user_id)
+    candidates = load_candidate_ingredients(db, user_id, inventory.keys())
+
+    return [
+        evaluate_recipe(recipe_id, required, inventory)
+        for recipe_id, required in candidates.items()
+    ]
+
+
+def check_feasibility_batch(
+    db: Session, user_id: int, recipe_ids: List[int]
+) -> List[schemas.InventoryCheckResponse]:
+    """
+    Evaluate an explicit set of recipes in one pass: the inventory is loaded
+    once and the ingredients of all requested recipes come from one query.
+    Unknown or non-accessible ids are skipped; order follows `recipe_ids`.
+    """
+    requested = list(dict.fromkeys(recipe_ids))  # de-duplicate, keep order
+    accessible_ids = set(
+        db.scalars(
+            select(models.Recipe.id).filter(
+                models.Recipe.id.in_(requested),
+                accessible_recipes_clause(user_id),
+            )
+        ).all()
+    )
+    if not accessible_ids:
+        return []
+
+    inventory = load_inventory(db, user_id)
+    ingredients = load_recipe_ingredients(db, list(accessible_ids))
+
+    return [
+        evaluate_recipe(recipe_id, ingredients.get(recipe_id, []), inventory)
+        for recipe_id in requested
+        if recipe_id in accessible_ids
+    ]
+
+
+def backfill_base_quantities(db: Session, batch_size: int = 1000) -> int:
+    """
+    Fill base_quantity / base_unit for rows written before normalization,
+    one batch per transaction. Returns the number of rows updated.
+    """
+    updated = 0
+    for model in (models.Ingredient, models.RecipeIngredient):
+        while True:
+            rows = db.scalars(
+                select(model).filter(model.base_unit.is_(None)).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            for row in rows:
+                row.base_quantity, row.base_unit = units.to_base(row.quantity, row.unit)
+            db.commit()
+            updated += len(rows)
+    return updated
+
+
+# ====================================================================
+# SET-BASED EVALUATION (POSTGRESQL)
+# ====================================================================
+
+def check_feasibility_sql(
+    db: Session, user_id: int
+) -> List[schemas.InventoryCheckSummary]:
+    """
+    Same candidate set as check_feasibility(), computed in ONE SQL statement:
+    inventory aggregated by (catalog id, base unit), joined to recipe_ingredients,
+    grouped by recipe_id. Only small result rows are returned; no Recipe /
+    RecipeIngredient ORM objects are hydrated.
+    """
+    ing = models.Ingredient
+    req = models.RecipeIngredient
+
+    # COALESCE: legacy rows not yet backfilled fall back to the raw unit
+    inv_unit = func.coalesce(ing.base_unit, func.lower(ing.unit))
+    inv = (
+        select(
+            ing.catalog_id.label("catalog_id"),
+            inv_unit.label("unit"),
+            func.sum(func.coalesce(ing.base_quantity, ing.quantity)).label("quantity"),
+        )
+        .filter(ing.owner_id == user_id, ing.catalog_id.isnot(None))
+        .group_by(ing.catalog_id, inv_unit)
+        .cte("inv")
+    )
+    inv_keys = select(inv.c.catalog_id).distinct().cte("inv_keys")
+
+    req_unit = func.coalesce(req.base_unit, func.lower(req.unit))
+    req_quantity = func.coalesce(req.base_quantity, req.quantity)
+
+    covered = func.coalesce(inv.c.quantity, 0) + QUANTITY_EPSILON >= req_quantity
+    shortfall = func.json_strip_nulls(
+        func.json_build_object(
+            "name", req.name,
+            "quantity", req.quantity,
+            "unit", req.unit,
+            # Stock expressed in the recipe's unit
+            "available_quantity", inv.c.quantity * req.quantity / func.nullif(req_quantity, 0),
+            "reason", case(
+                (inv_keys.c.catalog_id.is_(None), "Missing entirely"),
+                (inv.c.quantity.is_(None), "Unit mismatch"),
+                else_="Insufficient quantity",
+            ),
+        )
+    )
+
+    candidate_ids = select(req.recipe_id).filter(
+        req.catalog_id.in_(select(inv_keys.c.catalog_id))
+    )
+
+    stmt = (
+        select(
+            req.recipe_id,
+            func.count().label("need_count"),
+            func.count().filter(covered).label("have_count"),
+            func.coalesce(
+                func.json_agg(shortfall).filter(~covered),
+                literal_column("'[]'::json"),
+            ).label("shortfalls"),
+        )
+        .select_from(req)
+        .join(models.Recipe, models.Recipe.id == req.recipe_id)
+        .outerjoin(inv, (inv.c.catalog_id == req.catalog_id) & (inv.c.unit == req_unit))
+        .outerjoin(inv_keys, inv_keys.c.catalog_id == req.catalog_id)
+        .filter(
+            accessible_recipes_clause(user_id),
+            req.recipe_id.in_(candidate_ids),
+        )
+        .group_by(req.recipe_id)
+        .order_by(req.recipe_id)
+    )
+
+    return [
+        schemas.InventoryCheckSummary(
+            recipe_id=row.recipe_id,
+            can_make=row.have_count == row.need_count,
+            have_count=row.have_count,
+            need_count=row.need_count,
+            shortfalls=row.shortfalls,
+        )
+        for row in db.execute(stmt)
+    ]
+
+
+# ====================================================================
+# RANKING ("COOK NOW" TOP-K)
+# ====================================================================
+
+def expiry_urgency(expiry_date: Optional[date], today: date) -> float:
+    """1.0 for expired / expiring today, decreasing to 0.0 at the horizon."""
+    if expiry_date is None:
+        return 0.0
+    days_left = (expiry_date - today).days
+    if days_left <= 0:
+        return 1.0
+    return max(0.0, 1.0 - days_left / URGENCY_HORIZON_DAYS)
+
+
+def score_recipe(
+    required_ingredients: List[models.RecipeIngredient],
+    inventory: Inventory,
+    today: date,
+) -> Tuple[float, float, float]:
+    """
+    Return (score, coverage, urgency) for one recipe.
+
+    coverage: fraction of required ingredients available in sufficient quantity.
+    urgency: highest expiry urgency among the inventory items the recipe uses.
+    """
+    if not required_ingredients:
+        return 0.0, 0.0, 0.0
+
+    covered = 0
+    urgency = 0.0
+    for req_ing in required_ingredients:
+        key = req_ing.catalog_id
+        if not inventory.has(key):
+            continue
+        req_quantity, req_unit = base_amount(req_ing)
+        if inventory.available(key, req_unit) + QUANTITY_EPSILON >= req_quantity:
+            covered += 1
+        urgency = max(urgency, expiry_urgency(inventory.expiry.get(key), today))
+
+    coverage = covered / len(required_ingredients)
+    score = COVERAGE_WEIGHT * coverage + URGENCY_WEIGHT * urgency
+    return score, coverage, urgency
+
+
+def encode_cursor(score: float, recipe_id: int) -> str:
+    """Opaque pagination cursor: position of the last returned item."""
+    raw = json.dumps({"s": score, "id": recipe_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    """Inverse of encode_cursor. Raises ValueError on a malformed cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(data["s"]), int(data["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def rank_feasible_recipes(
+    db: Session,
+    user_id: int,
+    k: int = 10,
+    cursor: Optional[str] = None,
+    today: Optional[date] = None,
+) -> schemas.RankedRecipePage:
+    """
+    Return the k best recipes ordered by (score desc, recipe_id asc).
+
+    Every candidate is scored, but only the k winners are kept (bounded heap)
+    and fully evaluated / serialized. `cursor` resumes after the last item of
+    the previous page. Large public catalogs are scored by the vectorized
+    catalog matrix; the user's private recipes always use the Python path.
+    """
+    # Deferred import: feasibility_matrix imports this module
+    from app.crud.feasibility_matrix import catalog_matrix
+
+    today = today or date.today()
+    after = decode_cursor(cursor) if cursor else None
+
+    inventory = load_inventory(db, user_id)
+    matrix = catalog_matrix.get(db)
+
+    scored: List[Tuple[Tuple[float, int], float, float]] = []
+    if matrix is not None:
+        for score, recipe_id, coverage, urgency in matrix.score(inventory, today).top(k + 1, after):
+            scored.append(((-score, recipe_id), coverage, urgency))
+        candidates = load_candidate_ingredients(
+            db, user_id, inventory.keys(), private_only=True
+        )
+    else:
+        candidates = load_candidate_ingredients(db, user_id, inventory.keys())
+
+    def keys():
+        yield from scored
+        for recipe_id, required in candidates.items():
+            score, coverage, urgency = score_recipe(required, inventory, today)
+            key = (-score, recipe_id)
+            if after is not None and key <= (-after[0], after[1]):
+                continue
+            yield key, coverage, urgency
+
+    # k + 1 to know whether another page exists
+    top = heapq.nsmallest(k + 1, keys(), key=lambda item: item[0])
+    has_more = len(top) > k
+    top = top[:k]
+
+    winner_ids = [key[1] for key, _, _ in top]
+    missing_ids = [recipe_id for recipe_id in winner_ids if recipe_id not in candidates]
+    if missing_ids:
+        candidates.update(load_recipe_ingredients(db, missing_ids))
+
+    titles: Dict[int, str] = {}
+    if top:
+        titles = dict(
+            db.execute(
+                select(models.Recipe.id, models.Recipe.title).filter(
+                    models.Recipe.id.in_(winner_ids)
+                )
+            ).all()
+        )
+
+    items = []
+    for (neg_score, recipe_id), coverage, urgency in top:
+        result = evaluate_recipe(recipe_id, candidates.get(recipe_id, []), inventory)
+        items.append(
+            schemas.RankedRecipe(
+                **result.model_dump(),
+                title=titles.get(recipe_id, ""),
+                score=-neg_score,
+                coverage=coverage,
+                urgency=urgency,
+            )
+        )
+
+    next_cursor = None
+    if has_more and items:
+        next_cursor = encode_cursor(items[-1].score, items[-1].recipe_id)
+
+    return schemas.RankedRecipePage(items=items, next_cursor=next_cursor)
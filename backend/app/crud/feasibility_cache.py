@@ -0,0 +1,249 @@
+# app/crud/feasibility_cache.py
+"""
+Per-user cache of /recipes/check-inventory results.
+
+Results only change when the user's inventory or an accessible recipe
+changes. The write paths (routers/ingredients.py, routers/recipes.py) call
+the hooks below, which re-evaluate only the affected recipes.
+
+The cache lives in each gunicorn worker. Every entry carries the version
+stamps (crud/data_versions.py) of the data it was computed from: the user's
+inventory, their own recipes and the public catalog. Database triggers bump
+them inside the writing transaction, once per transaction, so a reader only
+sees a new version together with the committed data behind it. A hit
+re-reads them in one small query, so a write handled by another worker
+turns into a miss instead of stale data. After a local write, an entry is
+updated in place only if every version that write bumped moved by exactly
+one, i.e. that write alone happened; otherwise it is dropped.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.crud import data_versions, feasibility
+
+# (own recipes version, public catalog version)
+CatalogStamp = Tuple[int, int]
+
+MAX_CACHED_USERS = 1000
+
+
+class _Entry:
+    """Immutable snapshot for one user (replaced, never mutated in place)."""
+
+    def __init__(
+        self,
+        inventory: feasibility.Inventory,
+        results: Dict[int, schemas.InventoryCheckResponse],
+        inventory_stamp: int,
+        catalog_stamp: CatalogStamp,
+    ):
+        self.inventory = inventory
+        self.results = results
+        self.inventory_stamp = inventory_stamp
+        self.catalog_stamp = catalog_stamp
+        self.ordered = [results[recipe_id] for recipe_id in sorted(results)]
+
+
+class FeasibilityCache:
+    def __init__(self, max_users: int = MAX_CACHED_USERS):
+        self.max_users = max_users
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------
+    # Read path
+    # ----------------------------------------------------------------
+
+    def get(self, db: Session, user_id: int) -> List[schemas.InventoryCheckResponse]:
+        """Cached equivalent of feasibility.check_feasibility()."""
+        inventory_stamp, catalog_stamp = data_versions.user_versions(db, user_id)
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if (
+                entry is not None
+                and entry.inventory_stamp == inventory_stamp
+                and entry.catalog_stamp == catalog_stamp
+            ):
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry.ordered
+            self.misses += 1
+
+        inventory = feasibility.load_inventory(db, user_id)
+        candidates = feasibility.load_candidate_ingredients(db, user_id, inventory.keys())
+        results = {
+            recipe_id: feasibility.evaluate_recipe(recipe_id, required, inventory)
+            for recipe_id, required in candidates.items()
+        }
+        entry = _Entry(inventory, results, inventory_stamp, catalog_stamp)
+        self._store(user_id, entry)
+        return entry.ordered
+
+    # ----------------------------------------------------------------
+    # Write hooks: inventory
+    # ----------------------------------------------------------------
+
+    def ingredient_written(
+        self,
+        db: Session,
+        ingredient: models.Ingredient,
+        old_catalog_id: Optional[int] = None,
+    ) -> None:
+        """An ingredient was created or updated (after commit)."""
+        keys = {ingredient.catalog_id, old_catalog_id} - {None}
+        self._inventory_changed(db, ingredient.owner_id, keys)
+
+    def ingredient_deleted(
+        self, db: Session, user_id: int, catalog_id: Optional[int]
+    ) -> None:
+        """An ingredient was deleted (after commit)."""
+        self._inventory_changed(db, user_id, {catalog_id} - {None})
+
+    def _inventory_changed(self, db: Session, user_id: int, keys: Iterable[int]) -> None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return
+
+        inventory_stamp, catalog_stamp = data_versions.user_versions(db, user_id)
+        if (
+            inventory_stamp != entry.inventory_stamp + 1
+            or catalog_stamp != entry.catalog_stamp
+        ):
+            self.invalidate(user_id)
+            return
+
+        # Only recipes using one of the touched ingredients can change
+        inventory = feasibility.load_inventory(db, user_id)
+        affected = feasibility.load_candidate_ingredients(db, user_id, keys)
+        results = dict(entry.results)
+        for recipe_id, required in affected.items():
+            if any(inventory.has(req.catalog_id) for req in required):
+                results[recipe_id] = feasibility.evaluate_recipe(recipe_id, required, inventory)
+            else:
+                results.pop(recipe_id, None)
+
+        self._replace(user_id, entry, _Entry(inventory, results, inventory_stamp, catalog_stamp))
+
+    # ----------------------------------------------------------------
+    # Write hooks: recipes
+    # ----------------------------------------------------------------
+
+    def recipe_written(
+        self, db: Session, recipe: models.Recipe, was_public: bool = False
+    ) -> None:
+        """
+        A recipe (or its ingredients) was created or updated (after commit).
+        `was_public`: its visibility before the write.
+        """
+        if not self._entries:
+            return
+
+        required = db.scalars(
+            select(models.RecipeIngredient)
+            .filter(models.RecipeIngredient.recipe_id == recipe.id)
+            .order_by(models.RecipeIngredient.id)
+        ).all()
+
+        def apply(user_id: int, entry: _Entry) -> Dict[int, schemas.InventoryCheckResponse]:
+            results = dict(entry.results)
+            accessible = recipe.is_public or recipe.owner_id == user_id
+            if accessible and any(entry.inventory.has(req.catalog_id) for req in required):
+                results[recipe.id] = feasibility.evaluate_recipe(recipe.id, required, entry.inventory)
+            else:
+                results.pop(recipe.id, None)
+            return results
+
+        self._catalog_changed(db, recipe.owner_id, was_public or recipe.is_public, apply)
+
+    def recipe_deleted(
+        self, db: Session, recipe_id: int, owner_id: int, was_public: bool
+    ) -> None:
+        """A recipe was deleted (after commit)."""
+        if not self._entries:
+            return
+
+        def apply(user_id: int, entry: _Entry) -> Dict[int, schemas.InventoryCheckResponse]:
+            results = dict(entry.results)
+            results.pop(recipe_id, None)
+            return results
+
+        self._catalog_changed(db, owner_id, was_public, apply)
+
+    def _catalog_changed(self, db, owner_id: int, public: bool, apply) -> None:
+        """
+        The write bumped the owner's recipes version, and the public one when
+        the recipe was public before or after it: one query covers every
+        cached user.
+        """
+        own_version, public_version = data_versions.catalog_versions(db, owner_id)
+
+        with self._lock:
+            snapshot = list(self._entries.items())
+
+        for user_id, entry in snapshot:
+            own, shared = entry.catalog_stamp
+            if user_id != owner_id and not public:
+                # Someone else's private recipe: not visible, nothing to do
+                continue
+            if user_id == owner_id:
+                if own_version != own + 1:
+                    self.invalidate(user_id)
+                    continue
+                own = own_version
+            if public:
+                if public_version != shared + 1:
+                    self.invalidate(user_id)
+                    continue
+                shared = public_version
+            results = apply(user_id, entry)
+            self._replace(
+                user_id,
+                entry,
+                _Entry(entry.inventory, results, entry.inventory_stamp, (own, shared)),
+            )
+
+    # ----------------------------------------------------------------
+    # Housekeeping
+    # ----------------------------------------------------------------
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        """Drop one user's entry, or everything when user_id is None."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+    def _replace(self, user_id: int, old: _Entry, new: _Entry) -> None:
+        """Store `new` only if no other thread replaced `old` meanwhile."""
+        with self._lock:
+            if self._entries.get(user_id) is old:
+                self._entries[user_id] = new
+
+    def _store(self, user_id: int, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[user_id] = entry
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+
+# One instance per worker process
+feasibility_cache = FeasibilityCache()
@@ -0,0 +1,227 @@
+# app/crud/feasibility_matrix.py
+"""
+Vectorized feasibility for the public recipe catalog.
+
+Public recipes are compiled into a sparse (CSR) recipe x canonical-ingredient
+matrix of required base quantities; columns are (catalog id, base unit).
+A user's inventory becomes a dense vector over the same columns, so coverage,
+shortfall and urgency for every recipe come from a handful of NumPy
+operations instead of nested Python loops.
+
+Required ingredients without a catalog id (blank name) get no column but
+still count in their recipe's length: they are never covered, exactly as in
+feasibility.score_recipe().
+
+The matrix is rebuilt when the public catalog version (crud/data_versions.py)
+changes. It only serves the ranking: /check-inventory returns the missing and
+available items of every candidate, which needs the ingredient rows anyway.
+"""
+import threading
+from collections import defaultdict
+from datetime import date
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud import data_versions
+from app.crud.feasibility import (
+    COVERAGE_WEIGHT,
+    QUANTITY_EPSILON,
+    URGENCY_WEIGHT,
+    Inventory,
+    expiry_urgency,
+)
+
+# Below this many public recipes the Python path is just as fast
+MATRIX_MIN_RECIPES = 2000
+
+
+class CatalogScores:
+    """Per-recipe results for the recipes sharing an ingredient with the inventory."""
+
+    def __init__(self, recipe_ids, score, coverage, urgency):
+        self.recipe_ids = recipe_ids
+        self.score = score
+        self.coverage = coverage
+        self.urgency = urgency
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    def top(self, k: int, after: Optional[Tuple[float, int]] = None) -> List[Tuple[float, int, float, float]]:
+        """
+        Best k entries ordered by (score desc, recipe_id asc), strictly after
+        the `after` cursor position. Returns (score, recipe_id, coverage, urgency).
+        """
+        keep = np.ones(len(self.recipe_ids), dtype=bool)
+        if after is not None:
+            after_score, after_id = after
+            keep = (self.score < after_score) | (
+                (self.score == after_score) & (self.recipe_ids > after_id)
+            )
+        idx = np.flatnonzero(keep)
+
+        if len(idx) > k:
+            # Partial selection, then keep every tie of the k-th score so the
+            # (score, id) order stays deterministic across pages
+            kth = np.argpartition(-self.score[idx], k - 1)[:k]
+            threshold = self.score[idx][kth].min()
+            idx = idx[self.score[idx] >= threshold]
+
+        order = np.lexsort((self.recipe_ids[idx], -self.score[idx]))[:k]
+        idx = idx[order]
+        return [
+            (
+                float(self.score[i]),
+                int(self.recipe_ids[i]),
+                float(self.coverage[i]),
+                float(self.urgency[i]),
+            )
+            for i in idx
+        ]
+
+
+class CatalogMatrix:
+    """CSR matrix: row = recipe, column = (catalog id, base unit), value = base quantity."""
+
+    def __init__(self, rows: Iterable[Tuple[int, Optional[int], str, float]], stamp: int = 0):
+        """
+        `rows` = (recipe_id, catalog id, base unit, base quantity), sorted by
+        recipe_id. A None catalog id counts as an ingredient that is never in stock.
+        """
+        self.stamp = stamp
+        self.col_index: Dict[Tuple[int, str], int] = {}
+        key_cols: Dict[int, List[int]] = defaultdict(list)
+
+        recipe_ids: List[int] = []
+        indptr: List[int] = [0]
+        lengths: List[int] = []
+        cols: List[int] = []
+        need: List[float] = []
+
+        for recipe_id, recipe_rows in groupby(rows, key=lambda row: row[0]):
+            length = 0
+            for _, catalog_id, unit, quantity in recipe_rows:
+                length += 1
+                if catalog_id is None:
+                    continue
+                key = (catalog_id, unit)
+                col = self.col_index.get(key)
+                if col is None:
+                    col = self.col_index[key] = len(self.col_index)
+                    key_cols[catalog_id].append(col)
+                cols.append(col)
+                need.append(quantity)
+            # No matched ingredient: never a candidate, and no empty CSR row
+            if len(cols) == indptr[-1]:
+                continue
+            recipe_ids.append(recipe_id)
+            indptr.append(len(cols))
+            lengths.append(length)
+
+        self.key_cols = {key: np.asarray(c, dtype=np.int64) for key, c in key_cols.items()}
+        self.recipe_ids = np.asarray(recipe_ids, dtype=np.int64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.need = np.asarray(need, dtype=np.float64)
+        self.row_lengths = np.asarray(lengths, dtype=np.int64)
+
+    @property
+    def size(self) -> int:
+        return len(self.recipe_ids)
+
+    def score(self, inventory: Inventory, today: date) -> CatalogScores:
+        """Score every public recipe against one inventory (vectorized)."""
+        n_cols = len(self.col_index)
+        stock = np.zeros(n_cols, dtype=np.float64)
+        present = np.zeros(n_cols, dtype=bool)
+        urgency_col = np.zeros(n_cols, dtype=np.float64)
+
+        for key, quantity in inventory.quantities.items():
+            col = self.col_index.get(key)
+            if col is not None:
+                stock[col] = quantity
+        for catalog_id in inventory.units:
+            cols = self.key_cols.get(catalog_id)
+            if cols is not None:
+                present[cols] = True
+                urgency_col[cols] = expiry_urgency(inventory.expiry.get(catalog_id), today)
+
+        if self.size == 0:
+            empty = np.zeros(0)
+            return CatalogScores(self.recipe_ids, empty, empty, empty)
+
+        starts = self.indptr[:-1]
+        covered = stock[self.cols] + QUANTITY_EPSILON >= self.need
+        is_present = present[self.cols]
+
+        covered_count = np.add.reduceat(covered.astype(np.int64), starts)
+        present_count = np.add.reduceat(is_present.astype(np.int64), starts)
+        urgency = np.maximum.reduceat(np.where(is_present, urgency_col[self.cols], 0.0), starts)
+
+        coverage = covered_count / self.row_lengths
+        score = COVERAGE_WEIGHT * coverage + URGENCY_WEIGHT * urgency
+
+        # Same candidate set as the Python path: at least one shared ingredient
+        mask = present_count > 0
+        return CatalogScores(
+            self.recipe_ids[mask],
+            score[mask],
+            coverage[mask],
+            urgency[mask],
+        )
+
+
+# ====================================================================
+# PER-WORKER HOLDER
+# ====================================================================
+
+def build_catalog_matrix(db: Session, stamp: int) -> CatalogMatrix:
+    """Compile the public catalog (one query over recipe_ingredients)."""
+    req = models.RecipeIngredient
+    rows = db.execute(
+        select(
+            req.recipe_id,
+            req.catalog_id,
+            func.coalesce(req.base_unit, func.lower(req.unit)),
+            func.coalesce(req.base_quantity, req.quantity),
+        )
+        .join(models.Recipe, models.Recipe.id == req.recipe_id)
+        .filter(models.Recipe.is_public == True)  # noqa: E712
+        .order_by(req.recipe_id, req.id)
+    )
+    return CatalogMatrix(rows, stamp=stamp)
+
+
+class CatalogMatrixHolder:
+    def __init__(self):
+        self._matrix: Optional[CatalogMatrix] = None
+        self._lock = threading.Lock()
+
+    def get(self, db: Session) -> Optional[CatalogMatrix]:
+        """
+        Current matrix, rebuilt if the public catalog version moved.
+        None while the catalog is smaller than MATRIX_MIN_RECIPES.
+        """
+        stamp = data_versions.public_version(db)
+        matrix = self._matrix
+        if matrix is None or matrix.stamp != stamp:
+            # One rebuild at a time; other threads keep using the previous matrix
+            if self._lock.acquire(blocking=matrix is None):
+                try:
+                    if self._matrix is None or self._matrix.stamp != stamp:
+                        self._matrix = build_catalog_matrix(db, stamp)
+                    matrix = self._matrix
+                finally:
+                    self._lock.release()
+        # The size is that of the compiled catalog, no count(*) per request
+        if matrix is None or matrix.size < MATRIX_MIN_RECIPES:
+            return None
+        return matrix
+
+
+catalog_matrix = CatalogMatrixHolder()
@@ -0,0 +1,163 @@
+# app/crud/generation_cache.py
+"""
+Cache of Gemini-generated recipes (POST /recipes/generate), keyed on the
+inventory rather than on the user.
+
+The key is a fingerprint of the normalized inventory: canonical catalog
+names (ingredient_catalog), base units and quantities bucketed on a
+half-octave log scale, sorted. Clicking "generate" again with the same fridge
+(or one that only differs by a few grams) hits the cache instead of paying a
+2-10 s Gemini call.
+
+Two tiers:
+- per worker: LRU + TTL in memory;
+- shared: the generated_recipe_cache table, so the 4 gunicorn workers (and
+  restarts) reuse each other's generations. Reads and writes use their own
+  short session: no connection is held across the Gemini call.
+
+`fresh=true` skips the lookup; the new recipe then replaces the cached one.
+"""
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import models
+from app.crud.ingredient_catalog import normalize_ingredient_name
+from app.database import SessionLocal
+from app.utils import units
+
+logger = logging.getLogger(__name__)
+
+MAX_ENTRIES = 256
+TTL_SECONDS = 6 * 3600.0
+# Expired shared rows are purged every PURGE_EVERY writes of a worker
+PURGE_EVERY = 100
+
+
+def quantity_bucket(quantity: Optional[float]) -> int:
+    """Half-octave bucket: quantities within a factor of ~1.4 share a bucket."""
+    if not quantity or quantity <= 0:
+        return 0
+    return round(math.log2(quantity) * 2)
+
+
+def inventory_fingerprint(rows: Iterable[Any]) -> str:
+    """
+    Key of an inventory snapshot. Rows need name, quantity, unit and may carry
+    canonical_name (catalog) and base_quantity / base_unit.
+    """
+    items = set()
+    for row in rows:
+        name = getattr(row, "canonical_name", None) or normalize_ingredient_name(row.name)
+        quantity, unit = getattr(row, "base_quantity", None), getattr(row, "base_unit", None)
+        if quantity is None or unit is None:
+            quantity, unit = units.to_base(row.quantity, row.unit)
+        items.add(f"{name}:{unit}:{quantity_bucket(quantity)}")
+    return hashlib.sha256("\n".join(sorted(items)).encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- Local tier ----------------------------------------------------
+
+    def get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            return None
+
+    def _store_local(self, key: str, recipe: Dict[str, Any], ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (recipe, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # --- Shared tier (blocking: call from the threadpool) ---------------
+
+    def get_shared(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Shared lookup; a hit is copied to the local tier until it expires.
+        An unavailable shared tier counts as a miss.
+        """
+        try:
+            with SessionLocal() as db:
+                row = db.execute(
+                    select(models.GeneratedRecipeCache.recipe, models.GeneratedRecipeCache.expires_at)
+                    .filter(
+                        models.GeneratedRecipeCache.fingerprint == key,
+                        models.GeneratedRecipeCache.expires_at > datetime.now(timezone.utc),
+                    )
+                ).first()
+        except SQLAlchemyError:
+            logger.warning("Generated recipe cache lookup failed", exc_info=True)
+            row = None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        remaining = (_aware(row.expires_at) - datetime.now(timezone.utc)).total_seconds()
+        self._store_local(key, row.recipe, min(remaining, self.ttl))
+        with self._lock:
+            self.hits += 1
+        return row.recipe
+
+    def put(self, key: str, recipe: Dict[str, Any]) -> None:
+        """Store in both tiers (one short transaction for the shared one)."""
+        self._store_local(key, recipe, self.ttl)
+        table = models.GeneratedRecipeCache.__table__
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl)
+        with SessionLocal() as db:
+            db.execute(
+                pg_insert(table)
+                .values(fingerprint=key, recipe=recipe, expires_at=expires_at)
+                .on_conflict_do_update(
+                    index_elements=["fingerprint"],
+                    set_={"recipe": recipe, "expires_at": expires_at},
+                )
+            )
+            with self._lock:
+                self._writes += 1
+                purge = self._writes % PURGE_EVERY == 0
+            if purge:
+                db.execute(delete(table).where(table.c.expires_at <= datetime.now(timezone.utc)))
+            db.commit()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# One instance per worker process
+generation_cache = GenerationCache()
@@ -0,0 +1,314 @@
+# app/crud/ingredient_catalog.py
+"""
+Global ingredient catalog.
+
+Free-text names ("Tomatoes ", "spring onion") resolve to an integer catalog id
+through the `ingredient_aliases` table. Unknown names create a new catalog
+entry on the fly. Ingredient, RecipeIngredient and ShoppingItem rows carry the
+resolved `catalog_id` (set on write by a mapper hook in models.py), so
+matching becomes an indexed integer comparison instead of lower() string
+handling.
+
+Run as a script to backfill existing rows:
+    python -m app.crud.ingredient_catalog
+"""
+import re
+import threading
+from typing import Dict, Optional, Set
+
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud import recipe_similarity
+
+# synonym -> canonical name
+DEFAULT_SYNONYMS: Dict[str, str] = {
+    "tomatoes": "tomato",
+    "potatoes": "potato",
+    "onions": "onion",
+    "eggs": "egg",
+    "bananas": "banana",
+    "strawberries": "strawberry",
+    "chicken breasts": "chicken breast",
+    "scallion": "green onion",
+    "scallions": "green onion",
+    "spring onion": "green onion",
+    "spring onions": "green onion",
+    "aubergine": "eggplant",
+    "courgette": "zucchini",
+    "garbanzo beans": "chickpeas",
+    "bell peppers": "bell pepper",
+    "capsicum": "bell pepper",
+    "extra virgin olive oil": "olive oil",
+}
+
+# Aliases an earlier synonym table merged into another entry ("coriander" is
+# also the seed/spice, not only cilantro): they get an entry of their own
+OWN_ENTRY_ALIASES = ("coriander",)
+
+# alias -> catalog id, only for rows known to be committed
+_alias_cache: Dict[str, int] = {}
+_alias_cache_lock = threading.Lock()
+MAX_ALIAS_CACHE = 50_000
+
+# Aliases written by the connection's open transaction (connection.info)
+_PENDING = "pending_aliases"
+# Set when a savepoint rolled back: the pending ids may be gone
+_PENDING_UNSAFE = "pending_aliases_unsafe"
+
+
+def _cache_aliases(aliases: Dict[str, int]) -> None:
+    with _alias_cache_lock:
+        if len(_alias_cache) + len(aliases) > MAX_ALIAS_CACHE:
+            _alias_cache.clear()
+        _alias_cache.update(aliases)
+
+
+@event.listens_for(Engine, "commit")
+def _promote_pending_aliases(connection: Connection) -> None:
+    pending = connection.info.pop(_PENDING, None)
+    if pending and not connection.info.pop(_PENDING_UNSAFE, False):
+        _cache_aliases(pending)
+    connection.info.pop(_PENDING_UNSAFE, None)
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_pending_aliases(connection: Connection) -> None:
+    connection.info.pop(_PENDING, None)
+    connection.info.pop(_PENDING_UNSAFE, None)
+
+
+@event.listens_for(Engine, "rollback_savepoint")
+def _distrust_pending_aliases(connection: Connection, name, context) -> None:
+    if connection.info.get(_PENDING):
+        connection.info[_PENDING_UNSAFE] = True
+
+
+def normalize_ingredient_name(name: Optional[str]) -> str:
+    """Lowercase, trim and collapse whitespace: "  Olive   Oil" -> "olive oil"."""
+    return re.sub(r"\s+", " ", (name or "").strip().lower())
+
+
+def _lookup(connection: Connection, alias: str) -> Optional[int]:
+    aliases = models.IngredientAlias.__table__
+    return connection.execute(
+        select(aliases.c.catalog_id).where(aliases.c.alias == alias)
+    ).scalar()
+
+
+def _catalog_entry(connection: Connection, canonical: str) -> int:
+    """Id of the catalog entry named `canonical`, inserted if needed (race-safe)."""
+    catalog = models.IngredientCatalog.__table__
+    connection.execute(
+        pg_insert(catalog)
+        .values(canonical_name=canonical)
+        .on_conflict_do_nothing(index_elements=["canonical_name"])
+    )
+    return connection.execute(
+        select(catalog.c.id).where(catalog.c.canonical_name == canonical)
+    ).scalar_one()
+
+
+def _create(connection: Connection, canonical: str, alias: str) -> int:
+    """Insert the catalog entry + alias (race-safe) and return the catalog id."""
+    aliases = models.IngredientAlias.__table__
+    catalog_id = _catalog_entry(connection, canonical)
+
+    pending = connection.info.setdefault(_PENDING, {})
+    for value in {canonical, alias}:
+        connection.execute(
+            pg_insert(aliases)
+            .values(alias=value, catalog_id=catalog_id)
+            .on_conflict_do_nothing(index_elements=["alias"])
+        )
+        # Cached once the transaction commits (_promote_pending_aliases)
+        pending[value] = _lookup(connection, value)
+    return pending[alias]
+
+
+def resolve_catalog_id(connection: Connection, name: Optional[str]) -> Optional[int]:
+    """
+    Return the catalog id for a free-text name, creating the entry if needed.
+    Usable inside a flush (mapper events receive the Connection).
+    """
+    alias = normalize_ingredient_name(name)
+    if not alias:
+        return None
+
+    cached = _alias_cache.get(alias)
+    if cached is not None:
+        return cached
+
+    catalog_id = _lookup(connection, alias)
+    if catalog_id is not None:
+        # Rows written by this transaction wait for its commit: a rollback
+        # must not leave a dangling id in the cache
+        if alias not in connection.info.get(_PENDING, ()):
+            _cache_aliases({alias: catalog_id})
+        return catalog_id
+
+    canonical = DEFAULT_SYNONYMS.get(alias, alias)
+    return _create(connection, canonical, alias)
+
+
+def lookup_catalog_ids(db: Session, names) -> Dict[str, int]:
+    """Read-only resolution (no creation): normalized name -> catalog id."""
+    normalized = {normalize_ingredient_name(name) for name in names} - {""}
+    if not normalized:
+        return {}
+    return dict(
+        db.execute(
+            select(models.IngredientAlias.alias, models.IngredientAlias.catalog_id).filter(
+                models.IngredientAlias.alias.in_(normalized)
+            )
+        ).all()
+    )
+
+
+def match_catalog_ids(db: Session, term: str) -> Set[int]:
+    """
+    Catalog ids a search term refers to: its alias ("tomatoes" -> tomato)
+    plus every canonical name containing it as a whole word
+    ("chicken" -> chicken, chicken breast, ...).
+    """
+    term = normalize_ingredient_name(term)
+    if not term:
+        return set()
+    pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    catalog = models.IngredientCatalog
+    alias_ids = select(models.IngredientAlias.catalog_id).filter(
+        models.IngredientAlias.alias == term
+    )
+    return set(
+        db.scalars(
+            select(catalog.id).filter(
+                or_(
+                    catalog.id.in_(alias_ids),
+                    catalog.canonical_name == term,
+                    catalog.canonical_name.like(f"{pattern} %", escape="\\"),
+                    catalog.canonical_name.like(f"% {pattern}", escape="\\"),
+                    catalog.canonical_name.like(f"% {pattern} %", escape="\\"),
+                )
+            )
+        )
+    )
+
+
+# ====================================================================
+# STARTUP / BACKFILL
+# ====================================================================
+
+def _named_models():
+    return (
+        (models.Ingredient, models.Ingredient.name),
+        (models.RecipeIngredient, models.RecipeIngredient.name),
+        (models.ShoppingItem, models.ShoppingItem.item_name),
+    )
+
+
+def _repoint_alias(db: Session, alias: str, canonical: str) -> None:
+    """
+    Move an alias registered under an older synonym table to `canonical`,
+    along with the rows whose name is that alias.
+    """
+    connection = db.connection()
+    old_id = _lookup(connection, alias)
+    new_id = _catalog_entry(connection, canonical)
+    if old_id is None or old_id == new_id:
+        return
+
+    aliases = models.IngredientAlias.__table__
+    connection.execute(
+        update(aliases).where(aliases.c.alias == alias).values(catalog_id=new_id)
+    )
+    with _alias_cache_lock:
+        _alias_cache.pop(alias, None)
+
+    recipe_ids: Set[int] = set()
+    for model, name_column in _named_models():
+        names = [
+            name
+            for name in db.scalars(
+                select(name_column).filter(model.catalog_id == old_id).distinct()
+            )
+            if normalize_ingredient_name(name) == alias
+        ]
+        if not names:
+            continue
+        moved = (
+            update(model)
+            .where(model.catalog_id == old_id, name_column.in_(names))
+            .values(catalog_id=new_id)
+            .execution_options(synchronize_session=False)
+        )
+        if model is models.RecipeIngredient:
+            recipe_ids.update(db.scalars(moved.returning(model.recipe_id)))
+        else:
+            db.execute(moved)
+
+    if recipe_ids:
+        # Ingredient sets changed: reindex, and let fingerprint_missing redo the fingerprints
+        recipe_similarity.index_recipes(db, recipe_ids)
+        db.execute(
+            update(models.Recipe.__table__)
+            .where(models.Recipe.__table__.c.id.in_(recipe_ids))
+            .values(fingerprint=None, updated_at=models.Recipe.__table__.c.updated_at)
+        )
+
+
+def ensure_default_synonyms(db: Session) -> None:
+    """
+    Register DEFAULT_SYNONYMS (idempotent), and repoint aliases that an
+    earlier version of the table mapped elsewhere.
+    """
+    # A canonical name is an alias of its own entry ("bell pepper" once meant "pepper")
+    for name in sorted(set(DEFAULT_SYNONYMS.values()) | set(OWN_ENTRY_ALIASES)):
+        _repoint_alias(db, name, name)
+    connection = db.connection()
+    for synonym, canonical in DEFAULT_SYNONYMS.items():
+        if _lookup(connection, synonym) is None:
+            _create(connection, canonical, synonym)
+        else:
+            _repoint_alias(db, synonym, canonical)
+    db.commit()
+
+
+def backfill_catalog_ids(db: Session) -> int:
+    """
+    Set catalog_id on Ingredient / RecipeIngredient / ShoppingItem rows
+    written before the catalog existed: one UPDATE per distinct name.
+    Returns the number of rows updated.
+    """
+    updated = 0
+    for model, name_column in _named_models():
+        names = db.scalars(
+            select(name_column).filter(model.catalog_id.is_(None)).distinct()
+        ).all()
+        connection = db.connection()
+        for name in names:
+            catalog_id = resolve_catalog_id(connection, name)
+            if catalog_id is None:
+                continue
+            result = db.execute(
+                update(model)
+                .where(model.catalog_id.is_(None), name_column == name)
+                .values(catalog_id=catalog_id)
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        db.commit()
+    return updated
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        ensure_default_synonyms(session)
+        print(f"Backfilled catalog_id on {backfill_catalog_ids(session)} rows.")
+    finally:
+        session.close()
@@ -0,0 +1,197 @@
+# app/crud/public_recipe_cache.py
+"""
+In-process cache of anonymous GET /recipes/ and GET /recipes/{id} responses.
+
+Anonymous visitors only see public recipes, so every anonymous request with
+the same parameters gets the same answer. Responses are cached already
+rendered to JSON (LRU + TTL), per gunicorn worker.
+
+Invalidation:
+- the write paths (create / update / delete / seed) call `recipes_changed()`
+  after commit: the local cache is invalidated right away and a
+  `NOTIFY recipe_cache` is sent;
+- every worker runs an `InvalidationListener` thread (LISTEN recipe_cache)
+  that applies the invalidations sent by the other workers. The cache is
+  only enabled while that LISTEN connection is up: a worker that could miss
+  notifications does not serve cached data.
+
+A generation counter protects against a read that started before an
+invalidation storing its (stale) result after it.
+"""
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional
+
+import psycopg2
+from fastapi import Response
+from sqlalchemy import func, select as sql_select
+from sqlalchemy.orm import Session
+
+from app.database import SQLALCHEMY_DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "recipe_cache"
+ALL_RECIPES = "*"
+
+MAX_ENTRIES = 512
+TTL_SECONDS = 60.0
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, headers: Dict[str, str], expires_at: float):
+        self.body = body
+        self.headers = headers
+        self.expires_at = expires_at
+
+    def to_response(self) -> Response:
+        return Response(content=self.body, media_type="application/json", headers=self.headers)
+
+
+class PublicRecipeCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0
+        # Set by InvalidationListener while it is connected
+        self.enabled = False
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key) if self.enabled else None
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(
+        self, key: Hashable, body: bytes, headers: Dict[str, str], generation: int
+    ) -> CachedResponse:
+        """
+        Store a rendered response. `generation` is the value read before the
+        response was computed; if an invalidation happened since, the entry
+        is returned but not stored.
+        """
+        entry = CachedResponse(body, headers, time.monotonic() + self.ttl)
+        with self._lock:
+            if self.enabled and generation == self.generation:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, recipe_id: Optional[int] = None) -> None:
+        """
+        Drop every list page and the detail of `recipe_id`
+        (everything when recipe_id is None).
+        """
+        with self._lock:
+            self.generation += 1
+            if recipe_id is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[0] == "list" or key == ("recipe", recipe_id):
+                    del self._entries[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+# One instance per worker process
+public_recipe_cache = PublicRecipeCache()
+
+
+def recipes_changed(db: Session, recipe_id: Optional[int] = None) -> None:
+    """
+    A recipe was created / updated / deleted (after commit), or many recipes
+    when recipe_id is None: invalidate locally and notify the other workers.
+    """
+    public_recipe_cache.invalidate(recipe_id)
+    payload = ALL_RECIPES if recipe_id is None else str(recipe_id)
+    db.execute(sql_select(func.pg_notify(NOTIFY_CHANNEL, payload)))
+    db.commit()
+
+
+# ====================================================================
+# CROSS-WORKER INVALIDATION (LISTEN / NOTIFY)
+# ====================================================================
+
+class InvalidationListener:
+    """Background thread applying NOTIFY recipe_cache to the local cache."""
+
+    POLL_SECONDS = 1.0
+    RECONNECT_SECONDS = 5.0
+
+    def __init__(self, cache: PublicRecipeCache, dsn: str = SQLALCHEMY_DATABASE_URL):
+        self.cache = cache
+        self.dsn = dsn
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="recipe-cache-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.POLL_SECONDS * 2)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except psycopg2.Error:
+                logger.warning("Recipe cache listener disconnected, retrying", exc_info=True)
+            self._stop.wait(self.RECONNECT_SECONDS)
+
+    def _listen(self) -> None:
+        conn = psycopg2.connect(self.dsn)
+        try:
+            conn.set_session(autocommit=True)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+            # Anything cached before LISTEN took effect may be stale
+            self.cache.invalidate()
+            self.cache.enabled = True
+
+            while not self._stop.is_set():
+                if select.select([conn], [], [], self.POLL_SECONDS) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    payload = conn.notifies.pop(0).payload
+                    self.cache.invalidate(int(payload) if payload.isdigit() else None)
+        finally:
+            # Notifications may be missed from now on
+            self.cache.enabled = False
+            self.cache.invalidate()
+            conn.close()
+
+
+invalidation_listener = InvalidationListener(public_recipe_cache)
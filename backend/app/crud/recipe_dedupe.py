@@ -0,0 +1,291 @@
+# app/crud/recipe_dedupe.py
+"""
+Near-duplicate recipes (generated / imported / seeded variants of one dish).
+
+Two recipes are near-duplicates when their catalog ingredient sets are almost
+the same (estimated Jaccard >= INGREDIENT_THRESHOLD, through the LSH index of
+recipe_similarity.py) and their titles share most of their words (Jaccard >=
+TITLE_THRESHOLD on normalized title tokens). Recipe.fingerprint is an exact
+hash of (title tokens, ingredient set): identical recipes are found through
+ix_recipes_fingerprint without the LSH step.
+
+A recipe is only ever flagged as a duplicate of an older one
+(Recipe.duplicate_of_id), so flags never form cycles, and only of a recipe
+its owner can see (owner_scope: their own or public ones), since the flag is
+shown to the owner.
+
+- Write time: create / update fingerprint the recipe and flag it; the seed
+  endpoints flag the recipes they wrote (fingerprint_missing(flag=True)); the
+  bulk import skips lines that are exact duplicates of the owner's recipes or
+  of earlier lines, and flags the ones it writes.
+- Offline: `python -m app.crud.recipe_dedupe [--merge]` fingerprints and
+  flags the whole table; with --merge, duplicates owned by the same user as
+  their original are deleted.
+"""
+import hashlib
+import re
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, bindparam, delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.crud import recipe_similarity
+
+INGREDIENT_THRESHOLD = 0.7
+TITLE_THRESHOLD = 0.5
+# Most similar recipes whose titles are compared
+NEAR_CANDIDATES = 20
+BATCH_SIZE = 1000
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    {"a", "an", "and", "the", "with", "of", "in", "on", "style",
+     "de", "la", "le", "les", "et", "au", "aux", "du", "des"}
+)
+
+
+def title_tokens(title: Optional[str]) -> FrozenSet[str]:
+    """Lowercased words minus stopwords, with a naive plural strip."""
+    tokens = set()
+    for token in _TOKEN.findall((title or "").lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return frozenset(tokens)
+
+
+def title_similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def fingerprint(title: Optional[str], catalog_ids: Iterable[int]) -> int:
+    """Signed 64-bit hash (BIGINT) of the title tokens and the ingredient set."""
+    canonical = " ".join(sorted(title_tokens(title))) + "|" + ",".join(
+        str(catalog_id) for catalog_id in sorted(set(catalog_ids))
+    )
+    return int.from_bytes(
+        hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).digest(),
+        "little",
+        signed=True,
+    )
+
+
+def owner_scope(owner_id: Optional[int]):
+    """Recipes a recipe of `owner_id` may be flagged against: theirs, or public ones."""
+    return or_(models.Recipe.owner_id == owner_id, models.Recipe.is_public == True)
+
+
+def find_duplicate(
+    db: Session, recipe_id: int, title: Optional[str], recipe_fingerprint: int, scope_clause
+) -> Optional[int]:
+    """
+    Id of an older recipe (within `scope_clause`) that `recipe_id` duplicates:
+    the oldest exact match, else the most similar near match. The recipe's
+    ingredients must already be in the similarity index.
+    """
+    scope = and_(models.Recipe.id < recipe_id, scope_clause)
+    exact = db.scalar(
+        select(models.Recipe.id)
+        .filter(models.Recipe.fingerprint == recipe_fingerprint, scope)
+        .order_by(models.Recipe.id)
+        .limit(1)
+    )
+    if exact is not None:
+        return exact
+
+    ranked = recipe_similarity.similar_recipe_ids(
+        db, recipe_id, scope, NEAR_CANDIDATES, min_similarity=INGREDIENT_THRESHOLD
+    )
+    if not ranked:
+        return None
+    titles = dict(
+        db.execute(
+            select(models.Recipe.id, models.Recipe.title).filter(
+                models.Recipe.id.in_([candidate_id for candidate_id, _ in ranked])
+            )
+        ).all()
+    )
+    tokens = title_tokens(title)
+    for candidate_id, _ in ranked:
+        if candidate_id in titles and title_similarity(
+            tokens, title_tokens(titles[candidate_id])
+        ) >= TITLE_THRESHOLD:
+            return candidate_id
+    return None
+
+
+def check_recipe(
+    db: Session, recipe_id: int, title: Optional[str], catalog_ids: Iterable[int], scope_clause
+) -> Tuple[int, Optional[int]]:
+    """(fingerprint, duplicate_of_id) of a recipe being written."""
+    recipe_fingerprint = fingerprint(title, catalog_ids)
+    return recipe_fingerprint, find_duplicate(
+        db, recipe_id, title, recipe_fingerprint, scope_clause
+    )
+
+
+def existing_fingerprints(db: Session, owner_id: int, fingerprints: Iterable[int]) -> Dict[int, int]:
+    """fingerprint -> oldest recipe id of `owner_id` with that fingerprint."""
+    fingerprints = list(set(fingerprints))
+    if not fingerprints:
+        return {}
+    found: Dict[int, int] = {}
+    for recipe_fingerprint, recipe_id in db.execute(
+        select(models.Recipe.fingerprint, models.Recipe.id)
+        .filter(models.Recipe.owner_id == owner_id, models.Recipe.fingerprint.in_(fingerprints))
+        .order_by(models.Recipe.id.desc())
+    ):
+        found[recipe_fingerprint] = recipe_id
+    return found
+
+
+# ====================================================================
+# OFFLINE JOB
+# ====================================================================
+
+def _update_keeping_timestamp(values):
+    """UPDATE by id that leaves updated_at alone (no ETag / cache churn)."""
+    table = models.Recipe.__table__
+    return (
+        update(table)
+        .where(table.c.id == bindparam("recipe_id"))
+        .values(**values, updated_at=table.c.updated_at)
+    )
+
+
+def fingerprint_missing(db: Session, flag: bool = False) -> int:
+    """
+    Fingerprint every recipe without one, committing per batch. With `flag`,
+    they are also flagged against the older recipes their owner can see (the
+    similarity index must be up to date); a recipe whose flag changes gets a
+    new updated_at, so its detail ETag moves. Returns the count.
+    """
+    table = models.Recipe.__table__
+    keep_timestamp = _update_keeping_timestamp({"fingerprint": bindparam("fingerprint")})
+    reflag = (
+        update(table)
+        .where(table.c.id == bindparam("recipe_id"))
+        .values(fingerprint=bindparam("fingerprint"), duplicate_of_id=bindparam("duplicate_of_id"))
+    )
+    done = 0
+    while True:
+        rows = db.execute(
+            select(
+                models.Recipe.id,
+                models.Recipe.title,
+                models.Recipe.owner_id,
+                models.Recipe.duplicate_of_id,
+            )
+            .filter(models.Recipe.fingerprint.is_(None))
+            .order_by(models.Recipe.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return done
+        sets = recipe_similarity.ingredient_sets(db, [row.id for row in rows])
+        unchanged, flagged = [], []
+        for row in rows:
+            recipe_fingerprint = fingerprint(row.title, sets[row.id])
+            entry = {"recipe_id": row.id, "fingerprint": recipe_fingerprint}
+            if flag:
+                original = find_duplicate(
+                    db, row.id, row.title, recipe_fingerprint, owner_scope(row.owner_id)
+                )
+                if original != row.duplicate_of_id:
+                    flagged.append({**entry, "duplicate_of_id": original})
+                    continue
+            unchanged.append(entry)
+        if unchanged:
+            db.execute(keep_timestamp, unchanged)
+        if flagged:
+            db.execute(reflag, flagged)
+        db.commit()
+        done += len(rows)
+
+
+def dedupe(db: Session, merge: bool = False) -> Dict[str, int]:
+    """
+    Flag every recipe against the older recipes its owner can see. With `merge`,
+    a duplicate owned by the same user as its original is deleted instead.
+    Recipes are walked oldest first in batches, each batch committed.
+    """
+    fingerprint_missing(db)
+    recipe_similarity.index_missing(db)
+
+    stats = {"scanned": 0, "flagged": 0, "unflagged": 0, "merged": 0}
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(
+                models.Recipe.id,
+                models.Recipe.title,
+                models.Recipe.owner_id,
+                models.Recipe.fingerprint,
+                models.Recipe.duplicate_of_id,
+            )
+            .filter(models.Recipe.id > last_id)
+            .order_by(models.Recipe.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        flags = []
+        merged = []
+        for row in rows:
+            stats["scanned"] += 1
+            original = find_duplicate(
+                db, row.id, row.title, row.fingerprint, owner_scope(row.owner_id)
+            )
+            if merge and original is not None and db.scalar(
+                select(models.Recipe.owner_id).filter(models.Recipe.id == original)
+            ) == row.owner_id:
+                merged.append(row.id)
+                # Later rows of this batch must not match the merged one
+                db.execute(delete(models.Recipe).where(models.Recipe.id == row.id))
+                continue
+            if original != row.duplicate_of_id:
+                stats["flagged" if original is not None else "unflagged"] += 1
+                flags.append({"recipe_id": row.id, "duplicate_of_id": original})
+
+        if flags:
+            table = models.Recipe.__table__
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam("recipe_id"))
+                .values(duplicate_of_id=bindparam("duplicate_of_id")),
+                flags,
+            )
+        stats["merged"] += len(merged)
+        db.commit()
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.crud.public_recipe_cache import recipes_changed
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Flag (and optionally merge) near-duplicate recipes.")
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="delete duplicates owned by the same user as their original",
+    )
+    args = parser.parse_args()
+
+    session = SessionLocal()
+    try:
+        result = dedupe(session, merge=args.merge)
+        if result["flagged"] or result["unflagged"] or result["merged"]:
+            recipes_changed(session)
+        print(", ".join(f"{key}: {value}" for key, value in result.items()))
+    finally:
+        session.close()
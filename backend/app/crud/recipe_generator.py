@@ -1,18 +1,20 @@
 import json
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import Dict, Any, Sequence
 
 # Importation de httpx pour les requêtes HTTP asynchrones
 import httpx 
 from fastapi import HTTPException, status
 
-# Importez vos modèles SQLAlchemy et Pydantic pour la structure
-from .. import models, schemas 
+from ..utils.http_client import PooledAsyncClient
 
 # Configuration de l'API Gemini
 API_KEY = "" # Clé laissée vide pour l'environnement Canvas
 API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash-preview-09-2025:generateContent"
 
+# Client HTTP du worker : ouvert au démarrage, fermé à l'arrêt (main.py)
+gemini_http = PooledAsyncClient("gemini")
+
 # --- Schéma de Réponse pour la Génération (doit correspondre à schemas.RecipeCreate) ---
 
 RECIPE_SCHEMA = {
@@ -48,10 +50,12 @@ RECIPE_SCHEMA = {
 # --- Fonction Principale de Génération ---
 
 async def generate_recipe_from_ingredients(
-    user_ingredients: List[models.Ingredient]
+    user_ingredients: Sequence[Any]
 ) -> Dict[str, Any]:
     """
     Appelle l'API Gemini pour générer une recette basée sur l'inventaire de l'utilisateur.
+    `user_ingredients` : objets ou lignes avec name, quantity, unit, category
+    et expiry_date (aucune session n'est nécessaire pendant l'appel).
     """
     
     # Formatage de l'inventaire pour le prompt
@@ -95,55 +99,55 @@ async def generate_recipe_from_ingredients(
     max_retries = 3
     delay = 1
     
-    # Utilisation de httpx.AsyncClient pour les appels
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        for attempt in range(max_retries):
-            try:
-                # Effectuer l'appel à l'API en utilisant httpx
-                response = await client.post(
-                    API_URL,
-                    headers={'Content-Type': 'application/json', 'X-API-Key': API_KEY},
-                    json=payload # httpx gère la sérialisation JSON
+    # Client partagé du worker (pool de connexions keep-alive, HTTP/2)
+    client = gemini_http.client
+    for attempt in range(max_retries):
+        try:
+            # Effectuer l'appel à l'API en utilisant httpx
+            response = await client.post(
+                API_URL,
+                headers={'Content-Type': 'application/json', 'X-API-Key': API_KEY},
+                json=payload # httpx gère la sérialisation JSON
+            )
+            
+            # httpx lève une exception pour les statuts 4xx/5xx
+            response.raise_for_status() 
+            
+            result = response.json()
+            
+            # Extraction et parsing du JSON généré
+            json_text = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text')
+            
+            if json_text:
+                parsed_recipe = json.loads(json_text)
+                return parsed_recipe
+            
+            # Si le contenu est vide, on lève une exception pour forcer la nouvelle tentative (si possible)
+            raise Exception("Generated content was empty or missing from API response.")
+
+        except (httpx.RequestError, httpx.HTTPStatusError, json.JSONDecodeError) as e:
+            # Gère les erreurs de connexion, de statut HTTP et de parsing JSON
+            if attempt < max_retries - 1:
+                await asyncio.sleep(delay)
+                delay *= 2  # Exponential backoff
+            else:
+                # Échec après toutes les tentatives
+                detail = f"Erreur de l'API de génération de recette : {type(e).__name__} - {str(e)}"
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=detail
+                )
+        except Exception as e:
+            # Gère toutes les autres erreurs non-API spécifiques
+            if attempt < max_retries - 1:
+                await asyncio.sleep(delay)
+                delay *= 2
+            else:
+                detail = f"Erreur interne inattendue : {str(e)}"
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=detail
                 )
-                
-                # httpx lève une exception pour les statuts 4xx/5xx
-                response.raise_for_status() 
-                
-                result = response.json()
-                
-                # Extraction et parsing du JSON généré
-                json_text = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text')
-                
-                if json_text:
-                    parsed_recipe = json.loads(json_text)
-                    return parsed_recipe
-                
-                # Si le contenu est vide, on lève une exception pour forcer la nouvelle tentative (si possible)
-                raise Exception("Generated content was empty or missing from API response.")
-
-            except (httpx.RequestError, httpx.HTTPStatusError, json.JSONDecodeError) as e:
-                # Gère les erreurs de connexion, de statut HTTP et de parsing JSON
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(delay)
-                    delay *= 2  # Exponential backoff
-                else:
-                    # Échec après toutes les tentatives
-                    detail = f"Erreur de l'API de génération de recette : {type(e).__name__} - {str(e)}"
-                    raise HTTPException(
-                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                        detail=detail
-                    )
-            except Exception as e:
-                # Gère toutes les autres erreurs non-API spécifiques
-                if attempt < max_retries - 1:
-                    await asyncio.sleep(delay)
-                    delay *= 2
-                else:
-                    detail = f"Erreur interne inattendue : {str(e)}"
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail=detail
-                    )
 
     # Note: Cet endroit ne devrait pas être atteint
     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Erreur interne de génération de recette.")
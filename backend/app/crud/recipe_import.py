@@ -0,0 +1,181 @@
+# app/crud/recipe_import.py
+"""
+Bulk recipe import (POST /recipes/bulk).
+
+Lines are validated one by one against schemas.RecipeCreate; valid recipes
+are written in batches: one multi-row INSERT ... RETURNING for the recipes,
+one multi-row INSERT for all their ingredients, then their similarity index
+rows. Catalog ids are resolved once per distinct name per batch. Each batch
+commits on its own; when the database rejects one (e.g. calories out of the
+INTEGER range), it is rolled back and its lines are written one by one, so
+only the offending lines fail, each with its own error.
+
+Lines whose fingerprint (recipe_dedupe.fingerprint) matches one of the
+owner's recipes or an earlier line are skipped; the written recipes are
+flagged against the older recipes their owner can see, as on create.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.crud import recipe_dedupe, recipe_similarity
+from app.crud.recipe_ingredients import ingredient_values
+
+BATCH_SIZE = 500
+MAX_LINES = 50_000
+# A longer line aborts the import with 413
+MAX_LINE_BYTES = 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+
+
+def parse_line(raw: bytes) -> schemas.RecipeCreate:
+    """Validate one NDJSON line. Raises ValueError with a readable message."""
+    try:
+        return schemas.RecipeCreate.model_validate_json(raw)
+    except ValidationError as e:
+        raise ValueError(
+            "; ".join(
+                f"{'.'.join(str(part) for part in err['loc']) or 'line'}: {err['msg']}"
+                for err in e.errors()
+            )
+        ) from None
+
+
+def insert_batch(
+    db: Session,
+    owner_id: int,
+    batch: List[Tuple[int, schemas.RecipeCreate]],
+    seen: Dict[int, int],
+) -> Tuple[List[int], List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """
+    Write one batch of (line number, recipe). Returns (new recipe ids, failed
+    lines, skipped duplicates), lines as (line number, detail).
+
+    If the database rejects the batch, it is rolled back and retried line by
+    line. `seen` maps the fingerprints written by the earlier batches of the
+    same import to their line number; it is updated as batches commit.
+    """
+    if not batch:
+        return [], [], []
+    try:
+        recipe_ids, skipped = _write_batch(db, owner_id, batch, seen)
+        return recipe_ids, [], skipped
+    except SQLAlchemyError as e:
+        db.rollback()
+        if len(batch) == 1:
+            return [], [(batch[0][0], _database_error(e))], []
+
+    recipe_ids, failed, skipped = [], [], []
+    for entry in batch:
+        line_ids, line_failed, line_skipped = insert_batch(db, owner_id, [entry], seen)
+        recipe_ids.extend(line_ids)
+        failed.extend(line_failed)
+        skipped.extend(line_skipped)
+    return recipe_ids, failed, skipped
+
+
+def _database_error(e: SQLAlchemyError) -> str:
+    """First line of the driver message ("integer out of range")."""
+    message = str(getattr(e, "orig", None) or e).strip().splitlines()
+    return f"Database error ({e.__class__.__name__}): {message[0] if message else 'rejected'}"
+
+
+def _write_batch(
+    db: Session,
+    owner_id: int,
+    batch: List[Tuple[int, schemas.RecipeCreate]],
+    seen: Dict[int, int],
+) -> Tuple[List[int], List[Tuple[int, str]]]:
+    """One transaction for the whole batch; raises SQLAlchemyError."""
+    connection = db.connection()
+    catalog_ids: Dict[str, Optional[int]] = {}
+    prepared = []
+    for line_number, recipe in batch:
+        ingredients = [
+            ingredient_values(connection, item.name, item.quantity, item.unit, catalog_ids)
+            for item in recipe.required_ingredients
+        ]
+        ingredient_set = {
+            values["catalog_id"] for values in ingredients if values["catalog_id"] is not None
+        }
+        prepared.append(
+            (
+                line_number,
+                recipe,
+                ingredients,
+                ingredient_set,
+                recipe_dedupe.fingerprint(recipe.title, ingredient_set),
+            )
+        )
+
+    # Exact duplicates of the owner's recipes or of earlier lines are skipped
+    existing = recipe_dedupe.existing_fingerprints(db, owner_id, [entry[4] for entry in prepared])
+    written: Dict[int, int] = {}
+    kept = []
+    skipped: List[Tuple[int, str]] = []
+    for entry in prepared:
+        line_number, fingerprint = entry[0], entry[4]
+        if fingerprint in existing:
+            skipped.append((line_number, f"Duplicate of recipe {existing[fingerprint]}"))
+        elif fingerprint in seen or fingerprint in written:
+            earlier = seen.get(fingerprint, written.get(fingerprint))
+            skipped.append((line_number, f"Duplicate of line {earlier}"))
+        else:
+            written[fingerprint] = line_number
+            kept.append(entry)
+
+    recipe_ids: List[int] = []
+    if kept:
+        recipe_ids = list(
+            db.scalars(
+                insert(models.Recipe).returning(models.Recipe.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "owner_id": owner_id,
+                        "fingerprint": fingerprint,
+                        **recipe.model_dump(exclude={"required_ingredients"}, exclude_none=True),
+                    }
+                    for _, recipe, _, _, fingerprint in kept
+                ],
+            )
+        )
+
+        ingredient_rows = [
+            {"recipe_id": recipe_id, **values}
+            for recipe_id, (_, _, ingredients, _, _) in zip(recipe_ids, kept)
+            for values in ingredients
+        ]
+        if ingredient_rows:
+            db.execute(insert(models.RecipeIngredient), ingredient_rows)
+
+        recipe_similarity.index_signatures(
+            db,
+            {
+                recipe_id: ingredient_set
+                for recipe_id, (_, _, _, ingredient_set, _) in zip(recipe_ids, kept)
+            },
+        )
+
+        # Near-duplicates (needs the index rows above), as create_recipe does
+        scope = recipe_dedupe.owner_scope(owner_id)
+        flags = []
+        for recipe_id, (_, recipe, _, _, fingerprint) in zip(recipe_ids, kept):
+            original = recipe_dedupe.find_duplicate(db, recipe_id, recipe.title, fingerprint, scope)
+            if original is not None:
+                flags.append({"recipe_id": recipe_id, "duplicate_of_id": original})
+        if flags:
+            table = models.Recipe.__table__
+            db.execute(
+                update(table)
+                .where(table.c.id == bindparam("recipe_id"))
+                .values(duplicate_of_id=bindparam("duplicate_of_id")),
+                flags,
+            )
+
+    db.commit()
+    seen.update(written)
+    return recipe_ids, skipped
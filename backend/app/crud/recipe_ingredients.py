@@ -0,0 +1,133 @@
+# app/crud/recipe_ingredients.py
+"""
+Set-based writes of recipe_ingredients.
+
+Bulk statements bypass the mapper hooks of models.py, so the derived columns
+(base_quantity / base_unit, catalog_id) are computed here with the same
+helpers before the rows are sent.
+"""
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import models, schemas
+from app.crud.ingredient_catalog import normalize_ingredient_name, resolve_catalog_id
+from app.utils import units
+
+INGREDIENT_FIELDS = ("name", "quantity", "unit")
+
+
+def ingredient_values(
+    connection: Connection,
+    name: str,
+    quantity: float,
+    unit: str,
+    catalog_ids: Optional[Dict[str, Optional[int]]] = None,
+) -> Dict[str, object]:
+    """
+    Column values of one recipe ingredient, derived columns included.
+    `catalog_ids` memoizes name -> catalog id across calls of one batch.
+    """
+    if catalog_ids is None:
+        catalog_id = resolve_catalog_id(connection, name)
+    else:
+        if name not in catalog_ids:
+            catalog_ids[name] = resolve_catalog_id(connection, name)
+        catalog_id = catalog_ids[name]
+    base_quantity, base_unit = units.to_base(quantity, unit)
+    return {
+        "name": name,
+        "quantity": quantity,
+        "unit": unit,
+        "base_quantity": base_quantity,
+        "base_unit": base_unit,
+        "catalog_id": catalog_id,
+    }
+
+
+def apply_ingredient_diff(
+    db: Session,
+    recipe: models.Recipe,
+    wanted: Iterable[schemas.RecipeIngredientUpdate],
+) -> List[models.RecipeIngredient]:
+    """
+    Make `recipe.required_ingredients` equal to `wanted` with a minimal diff:
+    at most one DELETE, one bulk UPDATE (by primary key) and one multi-row
+    INSERT ... RETURNING, inside the caller's transaction.
+
+    Items carrying an `id` update that row; items without one reuse an
+    existing row with the same normalized name, so unchanged ingredients keep
+    their ids. Raises ValueError for an id that is not an ingredient of the
+    recipe (or is listed twice).
+
+    The loaded recipe (ingredient list and rows) is kept in sync in memory,
+    so it can be serialized without another query.
+    """
+    existing = {row.id: row for row in recipe.required_ingredients}
+    unmatched_by_name: Dict[str, List[models.RecipeIngredient]] = {}
+    for row in recipe.required_ingredients:
+        unmatched_by_name.setdefault(normalize_ingredient_name(row.name), []).append(row)
+
+    wanted = list(wanted)
+    matched: Dict[int, models.RecipeIngredient] = {}
+    # First pass: explicit ids
+    for item in wanted:
+        if item.id is None:
+            continue
+        row = existing.get(item.id)
+        if row is None or item.id in matched:
+            raise ValueError(f"Ingredient {item.id} does not belong to recipe {recipe.id}.")
+        matched[item.id] = row
+        unmatched_by_name[normalize_ingredient_name(row.name)].remove(row)
+
+    connection = db.connection()
+    plan: List[Optional[models.RecipeIngredient]] = []
+    updates: List[Dict[str, object]] = []
+    inserts: List[Dict[str, object]] = []
+    for item in wanted:
+        if item.id is not None:
+            row = matched[item.id]
+        else:
+            candidates = unmatched_by_name.get(normalize_ingredient_name(item.name))
+            row = candidates.pop(0) if candidates else None
+            if row is not None:
+                matched[row.id] = row
+
+        if row is None:
+            inserts.append(
+                {"recipe_id": recipe.id, **ingredient_values(connection, item.name, item.quantity, item.unit)}
+            )
+        elif any(getattr(row, field) != getattr(item, field) for field in INGREDIENT_FIELDS):
+            values = ingredient_values(connection, item.name, item.quantity, item.unit)
+            updates.append({"id": row.id, **values})
+            for key, value in values.items():
+                set_committed_value(row, key, value)
+        plan.append(row)
+
+    removed = [row_id for row_id in existing if row_id not in matched]
+    if removed:
+        db.execute(
+            delete(models.RecipeIngredient)
+            .where(models.RecipeIngredient.id.in_(removed))
+            .execution_options(synchronize_session=False)
+        )
+    if updates:
+        db.execute(update(models.RecipeIngredient), updates)
+    created: List[models.RecipeIngredient] = []
+    if inserts:
+        created = list(
+            db.scalars(
+                insert(models.RecipeIngredient).returning(
+                    models.RecipeIngredient, sort_by_parameter_order=True
+                ),
+                inserts,
+            )
+        )
+
+    new_rows = iter(created)
+    result = [row if row is not None else next(new_rows) for row in plan]
+    set_committed_value(recipe, "required_ingredients", result)
+    return result
@@ -0,0 +1,131 @@
+# app/crud/recipe_search.py
+"""
+Relevance-ranked recipe search.
+
+1. Full text: `websearch_to_tsquery` against the generated `recipes.search_vector`
+   (title > description > instructions), GIN index ix_recipes_search_vector,
+   ranked with ts_rank_cd. The last word is also matched as a prefix so
+   results update while the user is typing ("chick" -> chicken).
+2. Typo fallback: when full text finds nothing, titles are matched by trigram
+   word similarity (`<%`, GIN index ix_recipes_title_trgm) and ranked by it.
+
+Both steps apply on top of the caller's query, so visibility and other filters
+stay in the router.
+
+Ingredient filters (?with=chicken,tomato&without=nuts) resolve each term to
+catalog ids, then keep the recipes found in every "with" set and in no
+"without" set: one INTERSECT / NOT IN over ix_recipe_ingredients_catalog_id.
+"""
+import re
+from typing import Iterable, List, Optional
+
+from sqlalchemy import func, intersect, literal, or_, select, text
+from sqlalchemy.orm import Query
+
+from app import models
+from app.crud.ingredient_catalog import match_catalog_ids
+
+MAX_INGREDIENT_TERMS = 10
+
+SEARCH_CONFIG = "english"
+
+# pg_trgm word_similarity threshold for the typo fallback (pg_trgm default: 0.6)
+TRIGRAM_THRESHOLD = 0.4
+
+
+def _prefix_tsquery(term: str):
+    """tsquery matching every word, the last one as a prefix ("tomato sou" -> tomato & sou:*)."""
+    words = re.findall(r"\w+", term.lower())
+    if not words:
+        return None
+    lexemes = [f"'{word}'" for word in words]
+    lexemes[-1] += ":*"
+    return func.to_tsquery(SEARCH_CONFIG, " & ".join(lexemes))
+
+
+def fulltext(query: Query, term: str) -> Query:
+    """Filter `query` to full-text matches of `term`, best first."""
+    vector = models.Recipe.search_vector
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, term)
+    match = vector.op("@@")(tsquery)
+
+    prefix = _prefix_tsquery(term)
+    if prefix is not None:
+        match = or_(match, vector.op("@@")(prefix))
+        rank = func.greatest(func.ts_rank_cd(vector, tsquery), func.ts_rank_cd(vector, prefix))
+    else:
+        rank = func.ts_rank_cd(vector, tsquery)
+
+    return query.filter(match).order_by(rank.desc(), models.Recipe.id.desc())
+
+
+def fuzzy(query: Query, term: str) -> Query:
+    """Filter `query` to titles similar to `term` (misspellings), most similar first."""
+    # `<%` (the indexable operator) reads its threshold from this setting;
+    # is_local=true scopes it to the current transaction
+    query.session.execute(
+        text("SELECT set_config('pg_trgm.word_similarity_threshold', :threshold, true)"),
+        {"threshold": str(TRIGRAM_THRESHOLD)},
+    )
+    title = models.Recipe.title
+    return (
+        query.filter(literal(term).op("<%")(title))
+        .order_by(func.word_similarity(term, title).desc(), models.Recipe.id.desc())
+    )
+
+
+def search_recipes(query: Query, term: str, limit: int, skip: int = 0) -> List[models.Recipe]:
+    """
+    One page of ranked results. The trigram fallback is used only when full
+    text has no match at all.
+    """
+    recipes = fulltext(query, term).offset(skip).limit(limit).all()
+    if recipes:
+        return recipes
+    if skip and fulltext(query, term).first() is not None:
+        return []  # past the last full-text page
+    return fuzzy(query, term).offset(skip).limit(limit).all()
+
+
+def parse_terms(raw: Optional[str]) -> List[str]:
+    """"chicken, Tomato,,chicken" -> ["chicken", "tomato"] (order kept, capped)."""
+    terms: List[str] = []
+    for part in (raw or "").split(","):
+        term = part.strip().lower()
+        if term and term not in terms:
+            terms.append(term)
+    return terms[:MAX_INGREDIENT_TERMS]
+
+
+def ingredient_filter(
+    query: Query, with_terms: Iterable[str], without_terms: Iterable[str]
+) -> Optional[Query]:
+    """
+    Restrict `query` to recipes containing every `with_terms` ingredient and
+    none of `without_terms`. Returns None when a required ingredient is unknown
+    to the catalog (no recipe can match).
+    """
+    db = query.session
+    req = models.RecipeIngredient
+
+    with_sets = []
+    for term in with_terms:
+        ids = match_catalog_ids(db, term)
+        if not ids:
+            return None
+        with_sets.append(select(req.recipe_id).filter(req.catalog_id.in_(ids)))
+    if len(with_sets) == 1:
+        query = query.filter(models.Recipe.id.in_(with_sets[0]))
+    elif with_sets:
+        query = query.filter(models.Recipe.id.in_(intersect(*with_sets)))
+
+    excluded = set()
+    for term in without_terms:
+        excluded |= match_catalog_ids(db, term)
+    if excluded:
+        query = query.filter(
+            models.Recipe.id.notin_(
+                select(req.recipe_id).filter(req.catalog_id.in_(excluded))
+            )
+        )
+    return query
@@ -0,0 +1,179 @@
+# app/crud/recipe_similarity.py
+"""
+"More like this": recipes sharing ingredients (GET /recipes/{id}/similar).
+
+Each recipe's set of catalog ingredients is summarized by a MinHash signature
+(recipe_minhash) and its LSH band keys (recipe_lsh_buckets, indexed on
+(band, bucket)). A lookup only touches the recipes sharing at least one band
+key with the target (one index range per band), ranks them by the number of
+shared keys, then scores at most MAX_CANDIDATES signatures with NumPy: no
+pairwise scan of the catalog.
+
+The index is maintained incrementally on the write paths (create / update /
+bulk import / seed) inside the writer's transaction; rows go away with their
+recipe (ON DELETE CASCADE). `index_missing()` catches up on recipes written
+before the index existed, or by code that does not maintain it.
+"""
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils import minhash
+
+MAX_CANDIDATES = 500
+# Estimated Jaccard below this is not "similar"
+MIN_SIMILARITY = 0.2
+INDEX_BATCH_SIZE = 1000
+# Serializes index_missing() across the gunicorn workers starting together
+INDEX_LOCK_ID = 72_0002
+
+
+def index_signatures(db: Session, ingredient_sets: Dict[int, Set[int]]) -> None:
+    """
+    (Re)index recipes from their catalog ingredient ids, in the caller's
+    transaction: one DELETE and one multi-row INSERT per table.
+    """
+    if not ingredient_sets:
+        return
+    recipe_ids = list(ingredient_sets)
+    db.execute(delete(models.RecipeLshBucket).where(models.RecipeLshBucket.recipe_id.in_(recipe_ids)))
+    db.execute(delete(models.RecipeMinHash).where(models.RecipeMinHash.recipe_id.in_(recipe_ids)))
+
+    signatures = []
+    buckets = []
+    for recipe_id, catalog_ids in ingredient_sets.items():
+        sig = minhash.signature(catalog_ids)
+        signatures.append(
+            {
+                "recipe_id": recipe_id,
+                "signature": minhash.to_bytes(sig),
+                "ingredient_count": len(catalog_ids),
+            }
+        )
+        if sig is not None:
+            buckets.extend(
+                {"recipe_id": recipe_id, "band": band, "bucket": key}
+                for band, key in enumerate(minhash.band_keys(sig))
+            )
+    db.execute(insert(models.RecipeMinHash), signatures)
+    if buckets:
+        db.execute(insert(models.RecipeLshBucket), buckets)
+
+
+def ingredient_sets(db: Session, recipe_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """recipe id -> set of catalog ids, read from recipe_ingredients."""
+    sets: Dict[int, Set[int]] = {recipe_id: set() for recipe_id in recipe_ids}
+    if not sets:
+        return sets
+    rows = db.execute(
+        select(models.RecipeIngredient.recipe_id, models.RecipeIngredient.catalog_id).filter(
+            models.RecipeIngredient.recipe_id.in_(list(sets)),
+            models.RecipeIngredient.catalog_id.isnot(None),
+        )
+    )
+    for recipe_id, catalog_id in rows:
+        sets[recipe_id].add(catalog_id)
+    return sets
+
+
+def index_recipes(db: Session, recipe_ids: Iterable[int]) -> Dict[int, Set[int]]:
+    """
+    (Re)index recipes whose ingredients are already written (caller commits).
+    Returns their ingredient sets.
+    """
+    sets = ingredient_sets(db, recipe_ids)
+    index_signatures(db, sets)
+    return sets
+
+
+def index_missing(db: Session) -> int:
+    """Index every recipe without a signature, committing per batch. Returns the count."""
+    indexed = 0
+    while True:
+        db.execute(select(func.pg_advisory_xact_lock(INDEX_LOCK_ID)))
+        recipe_ids = db.scalars(
+            select(models.Recipe.id)
+            .outerjoin(models.RecipeMinHash, models.RecipeMinHash.recipe_id == models.Recipe.id)
+            .filter(models.RecipeMinHash.recipe_id.is_(None))
+            .order_by(models.Recipe.id)
+            .limit(INDEX_BATCH_SIZE)
+        ).all()
+        if not recipe_ids:
+            db.commit()
+            return indexed
+        index_recipes(db, recipe_ids)
+        db.commit()
+        indexed += len(recipe_ids)
+
+
+def _signature(db: Session, recipe_id: int) -> Optional[np.ndarray]:
+    raw = db.scalar(
+        select(models.RecipeMinHash.signature).filter(models.RecipeMinHash.recipe_id == recipe_id)
+    )
+    if raw is None:
+        # Not indexed yet (read-only path: computed, not stored)
+        return minhash.signature(ingredient_sets(db, [recipe_id])[recipe_id])
+    return minhash.from_bytes(raw)
+
+
+def similar_recipe_ids(
+    db: Session,
+    recipe_id: int,
+    visible_clause,
+    limit: int,
+    min_similarity: float = MIN_SIMILARITY,
+) -> List[Tuple[int, float]]:
+    """
+    Up to `limit` (recipe id, estimated Jaccard) among the recipes visible
+    through `visible_clause`, most similar first (ties by id), keeping only
+    scores >= min_similarity.
+    """
+    sig = _signature(db, recipe_id)
+    if sig is None:
+        return []
+
+    bucket = models.RecipeLshBucket
+    shared = (
+        select(bucket.recipe_id, func.count().label("shared_keys"))
+        .filter(
+            # One index probe per band (BitmapOr)
+            or_(
+                *(
+                    and_(bucket.band == band, bucket.bucket == key)
+                    for band, key in enumerate(minhash.band_keys(sig))
+                )
+            ),
+            bucket.recipe_id != recipe_id,
+        )
+        .group_by(bucket.recipe_id)
+        .subquery()
+    )
+    candidates = db.execute(
+        select(shared.c.recipe_id, models.RecipeMinHash.signature)
+        .join(models.Recipe, models.Recipe.id == shared.c.recipe_id)
+        .join(models.RecipeMinHash, models.RecipeMinHash.recipe_id == shared.c.recipe_id)
+        .filter(visible_clause)
+        .order_by(shared.c.shared_keys.desc(), shared.c.recipe_id)
+        .limit(MAX_CANDIDATES)
+    ).all()
+    if not candidates:
+        return []
+
+    ids = np.fromiter((row[0] for row in candidates), dtype=np.int64, count=len(candidates))
+    scores = minhash.similarity(sig, np.stack([minhash.from_bytes(row[1]) for row in candidates]))
+    keep = np.flatnonzero(scores >= min_similarity)
+    order = keep[np.lexsort((ids[keep], -scores[keep]))][:limit]
+    return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        print(f"Indexed {index_missing(session)} recipes.")
+    finally:
+        session.close()
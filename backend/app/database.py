@@ -3,7 +3,7 @@
 # 🎯 Objectif : Configuration de la base de données PostgreSQL
 # ------------------------------------------------------------
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 import os
@@ -38,11 +38,149 @@ def get_db():
     finally:
         db.close()
 
+# --- MISES À NIVEAU IDEMPOTENTES DU SCHÉMA ---
+# create_all() ne crée que les tables absentes : les index / colonnes ajoutés
+# plus tard sur des tables existantes sont appliqués ici ("IF NOT EXISTS").
+# Document plein texte des recettes (colonne générée recipes.search_vector) :
+# titre (poids A), description (B), instructions (C)
+RECIPE_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(instructions, '')), 'C')"
+)
+
+# Extensions nécessaires avant create_all (index trigram)
+SCHEMA_EXTENSIONS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+]
+
+SCHEMA_UPGRADES = [
+    "CREATE INDEX IF NOT EXISTS ix_recipe_ingredients_recipe_id "
+    "ON recipe_ingredients (recipe_id)",
+    "CREATE INDEX IF NOT EXISTS ix_ingredients_owner_id "
+    "ON ingredients (owner_id)",
+    # Quantités normalisées (registre d'unités, app/utils/units.py)
+    "ALTER TABLE ingredients ADD COLUMN IF NOT EXISTS base_quantity DOUBLE PRECISION",
+    "ALTER TABLE ingredients ADD COLUMN IF NOT EXISTS base_unit VARCHAR",
+    "ALTER TABLE recipe_ingredients ADD COLUMN IF NOT EXISTS base_quantity DOUBLE PRECISION",
+    "ALTER TABLE recipe_ingredients ADD COLUMN IF NOT EXISTS base_unit VARCHAR",
+    # Catalogue global d'ingrédients (app/crud/ingredient_catalog.py)
+    "ALTER TABLE ingredients ADD COLUMN IF NOT EXISTS catalog_id INTEGER "
+    "REFERENCES ingredient_catalog(id) ON DELETE SET NULL",
+    "ALTER TABLE recipe_ingredients ADD COLUMN IF NOT EXISTS catalog_id INTEGER "
+    "REFERENCES ingredient_catalog(id) ON DELETE SET NULL",
+    "ALTER TABLE shopping_items ADD COLUMN IF NOT EXISTS catalog_id INTEGER "
+    "REFERENCES ingredient_catalog(id) ON DELETE SET NULL",
+    # Index inversé ingrédient du catalogue -> recette (moteur de faisabilité)
+    "CREATE INDEX IF NOT EXISTS ix_recipe_ingredients_catalog_id "
+    "ON recipe_ingredients (catalog_id, recipe_id)",
+    "CREATE INDEX IF NOT EXISTS ix_ingredients_owner_catalog "
+    "ON ingredients (owner_id, catalog_id)",
+    "CREATE INDEX IF NOT EXISTS ix_shopping_items_list_catalog "
+    "ON shopping_items (shopping_list_id, catalog_id)",
+    # Remplacé par ix_recipe_ingredients_catalog_id
+    "DROP INDEX IF EXISTS ix_recipe_ingredients_name_lower",
+    # Pagination par curseur de GET /recipes/ (created_at, id)
+    "CREATE INDEX IF NOT EXISTS ix_recipes_created_at_id "
+    "ON recipes (created_at, id)",
+    # Recherche plein texte + tolérance aux fautes (app/crud/recipe_search.py)
+    "ALTER TABLE recipes ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({RECIPE_SEARCH_DOCUMENT}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_recipes_search_vector "
+    "ON recipes USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS ix_recipes_title_trgm "
+    "ON recipes USING gin (title gin_trgm_ops)",
+    # Suivi des modifications des listes de courses (ETag / If-None-Match)
+    "ALTER TABLE shopping_lists ADD COLUMN IF NOT EXISTS updated_at "
+    "TIMESTAMP WITH TIME ZONE DEFAULT now()",
+    "ALTER TABLE shopping_items ADD COLUMN IF NOT EXISTS updated_at "
+    "TIMESTAMP WITH TIME ZONE DEFAULT now()",
+    # Détection des quasi-doublons de recettes (app/crud/recipe_dedupe.py)
+    "ALTER TABLE recipes ADD COLUMN IF NOT EXISTS fingerprint BIGINT",
+    "ALTER TABLE recipes ADD COLUMN IF NOT EXISTS duplicate_of_id INTEGER "
+    "REFERENCES recipes(id) ON DELETE SET NULL",
+    "CREATE INDEX IF NOT EXISTS ix_recipes_fingerprint "
+    "ON recipes (fingerprint)",
+    # Compteurs de version (table data_versions, app/crud/data_versions.py) :
+    # incrémentés au plus une fois par transaction et par portée, au COMMIT
+    # (triggers de contrainte différés) : la ligne n'est verrouillée que le
+    # temps du commit, et un lecteur ne voit la nouvelle version qu'avec les
+    # données commitées. Une ligne par propriétaire : pas de ligne partagée
+    # par tous les écrivains.
+    "CREATE OR REPLACE FUNCTION bump_data_version(p_scope text, p_owner integer) "
+    "RETURNS void AS $$ DECLARE "
+    "marker text := 'data_versions.' || p_scope || '_' || coalesce(p_owner, 0); "
+    "BEGIN "
+    "IF current_setting(marker, true) = txid_current()::text THEN RETURN; END IF; "
+    "INSERT INTO data_versions (scope, owner_id, version, txid) "
+    "VALUES (p_scope, coalesce(p_owner, 0), 1, txid_current()) "
+    "ON CONFLICT (scope, owner_id) DO UPDATE "
+    "SET version = data_versions.version + 1, txid = EXCLUDED.txid "
+    "WHERE data_versions.txid IS DISTINCT FROM EXCLUDED.txid; "
+    "PERFORM set_config(marker, txid_current()::text, true); "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE OR REPLACE FUNCTION ingredients_bump_version() "
+    "RETURNS trigger AS $$ BEGIN "
+    "IF TG_OP <> 'INSERT' THEN PERFORM bump_data_version('inventory', OLD.owner_id); END IF; "
+    "IF TG_OP <> 'DELETE' THEN PERFORM bump_data_version('inventory', NEW.owner_id); END IF; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    # Toujours 'recipes' avant 'public' : ordre de verrouillage constant
+    "CREATE OR REPLACE FUNCTION recipes_bump_version() "
+    "RETURNS trigger AS $$ BEGIN "
+    "IF TG_OP <> 'INSERT' THEN "
+    "PERFORM bump_data_version('recipes', OLD.owner_id); "
+    "IF OLD.is_public THEN PERFORM bump_data_version('public', OLD.owner_id); END IF; "
+    "END IF; "
+    "IF TG_OP <> 'DELETE' THEN "
+    "PERFORM bump_data_version('recipes', NEW.owner_id); "
+    "IF NEW.is_public THEN PERFORM bump_data_version('public', NEW.owner_id); END IF; "
+    "END IF; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "CREATE OR REPLACE FUNCTION recipe_ingredients_bump_version() "
+    "RETURNS trigger AS $$ DECLARE v_owner integer; v_public boolean; BEGIN "
+    "SELECT owner_id, is_public INTO v_owner, v_public FROM recipes "
+    "WHERE id = CASE WHEN TG_OP = 'DELETE' THEN OLD.recipe_id ELSE NEW.recipe_id END; "
+    # Recette supprimée : son propre trigger a déjà compté
+    "IF FOUND THEN "
+    "PERFORM bump_data_version('recipes', v_owner); "
+    "IF v_public THEN PERFORM bump_data_version('public', v_owner); END IF; "
+    "END IF; "
+    "RETURN NULL; "
+    "END $$ LANGUAGE plpgsql",
+    "DROP TRIGGER IF EXISTS ingredients_version ON ingredients",
+    "CREATE CONSTRAINT TRIGGER ingredients_version AFTER INSERT OR UPDATE OR DELETE "
+    "ON ingredients DEFERRABLE INITIALLY DEFERRED "
+    "FOR EACH ROW EXECUTE FUNCTION ingredients_bump_version()",
+    "DROP TRIGGER IF EXISTS recipes_version ON recipes",
+    "CREATE CONSTRAINT TRIGGER recipes_version AFTER INSERT OR UPDATE OR DELETE "
+    "ON recipes DEFERRABLE INITIALLY DEFERRED "
+    "FOR EACH ROW EXECUTE FUNCTION recipes_bump_version()",
+    "DROP TRIGGER IF EXISTS recipe_ingredients_version ON recipe_ingredients",
+    "CREATE CONSTRAINT TRIGGER recipe_ingredients_version AFTER INSERT OR UPDATE OR DELETE "
+    "ON recipe_ingredients DEFERRABLE INITIALLY DEFERRED "
+    "FOR EACH ROW EXECUTE FUNCTION recipe_ingredients_bump_version()",
+    # Ancienne portée globale, remplacée par ('recipes' | 'public', owner_id)
+    "DELETE FROM data_versions WHERE scope = 'recipes' AND owner_id = 0",
+]
+
+# Verrou consultatif : les 4 workers gunicorn démarrent en même temps
+SCHEMA_UPGRADE_LOCK_ID = 72_0001
+
+
 # --- FONCTION DE CRÉATION SÉCURISÉE DES TABLES ---
 def create_db_tables_if_not_exists():
     """
-    Crée toutes les tables qui n'existent pas déjà dans la base.
+    Crée toutes les tables qui n'existent pas déjà dans la base,
+    puis applique les mises à niveau idempotentes (SCHEMA_UPGRADES).
     NE SUPPRIME PAS les données existantes.
     """
     from . import models  # Import local pour éviter l'import circulaire
-    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SCHEMA_UPGRADE_LOCK_ID})
+        for statement in SCHEMA_EXTENSIONS:
+            conn.execute(text(statement))
+        Base.metadata.create_all(bind=conn)
+        for statement in SCHEMA_UPGRADES:
+            conn.execute(text(statement))
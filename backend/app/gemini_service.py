@@ -1,6 +1,16 @@
+import asyncio
+import logging
 import os
+import random
 import time
-import google.generativeai as genai
+from typing import Optional
+
+import httpx
+
+from app.crud.recipe_generator import gemini_http
+from app.utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 # --- Gemini client configuration ---
 API_KEY = os.getenv("GEMINI_API_KEY")
@@ -8,36 +18,89 @@ API_KEY = os.getenv("GEMINI_API_KEY")
 if not API_KEY:
     raise RuntimeError("GEMINI_API_KEY is missing in the backend environment.")
 
-genai.configure(api_key=API_KEY)
+API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+MODELS = [
+    "models/gemini-2.0-flash",
+    "models/gemini-2.0-pro",
+]
+ATTEMPTS_PER_MODEL = 3
+# One budget for the whole request, retries and fallback model included
+DEADLINE_SECONDS = 20.0
+# Full-jitter exponential backoff: sleep uniform(0, min(CAP, BASE * 2**n))
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 4.0
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Identical concurrent prompts share one Gemini call (app/routers/ai.py)
+gemini_flight = SingleFlight("gemini")
+
+
+class GeminiUnavailable(Exception):
+    """Temporary upstream error (overload, rate limit, timeout): worth a retry."""
+
+
+def _backoff(retry: int) -> float:
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** retry))
+
+
+def _response_text(result: dict) -> Optional[str]:
+    candidates = result.get("candidates") or []
+    if not candidates:
+        return None
+    parts = (candidates[0].get("content") or {}).get("parts") or []
+    text = "".join(part.get("text", "") for part in parts)
+    return text.strip() or None
+
+
+async def _generate(model: str, prompt: str, timeout: float) -> str:
+    """One generateContent call on the worker's pooled client (no thread held)."""
+    try:
+        response = await asyncio.wait_for(
+            gemini_http.client.post(
+                f"{API_BASE}/{model}:generateContent",
+                headers={"x-goog-api-key": API_KEY},
+                json={"contents": [{"parts": [{"text": prompt}]}]},
+                timeout=httpx.Timeout(timeout, connect=min(5.0, timeout)),
+            ),
+            timeout,
+        )
+    except (asyncio.TimeoutError, httpx.TransportError) as e:
+        raise GeminiUnavailable(f"{type(e).__name__}: {e}") from e
+    if response.status_code in RETRYABLE_STATUSES:
+        raise GeminiUnavailable(f"HTTP {response.status_code}")
+    response.raise_for_status()
+    text = _response_text(response.json())
+    if text is None:
+        raise ValueError("empty response")
+    return text
 
 
-def ask_gemini(prompt: str) -> str:
+async def ask_gemini(prompt: str, deadline: float = DEADLINE_SECONDS) -> str:
     """
     Send a prompt to Google Gemini and return the textual response.
-    Handles temporary errors (e.g. 503 / UNAVAILABLE) with multiple retry attempts.
+    Temporary errors (e.g. 503 / UNAVAILABLE) are retried with jittered
+    exponential backoff, then on the next model, within one overall deadline.
     """
-    models_to_try = [
-        "models/gemini-2.0-flash",
-        "models/gemini-2.0-pro",
-    ]
+    expires = time.monotonic() + deadline
 
-    for model in models_to_try:
-        for attempt in range(3):
+    for model in MODELS:
+        for attempt in range(ATTEMPTS_PER_MODEL):
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                return "Error: Gemini did not answer in time."
             try:
-                response = genai.GenerativeModel(model).generate_content(prompt)
-                if hasattr(response, "text"):
-                    return response.text.strip()
-                elif hasattr(response, "candidates"):
-                    return response.candidates[0].content.parts[0].text
-                else:
-                    return str(response)
+                return await _generate(model, prompt, remaining)
+            except GeminiUnavailable as e:
+                logger.warning(
+                    "Model %s unavailable (%s) — attempt %d/%d",
+                    model, e, attempt + 1, ATTEMPTS_PER_MODEL,
+                )
+                if attempt + 1 < ATTEMPTS_PER_MODEL:
+                    # Never sleep past the deadline
+                    pause = min(_backoff(attempt), expires - time.monotonic())
+                    if pause > 0:
+                        await asyncio.sleep(pause)
             except Exception as e:
-                err = str(e)
-                if "503" in err or "UNAVAILABLE" in err:
-                    print(f"[!] Model {model} overloaded — attempt {attempt + 1}/3...")
-                    time.sleep(2)
-                    continue
-                else:
-                    return f"Error while calling Gemini ({model}): {e}"
+                return f"Error while calling Gemini ({model}): {e}"
 
     return "Error: all Gemini models are temporarily unavailable."
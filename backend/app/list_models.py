@@ -1,13 +1,27 @@
 import os
-from google import genai
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+import httpx
+
+# Même API REST que app/gemini_service.py (pas de SDK Google)
+API_BASE = "https://generativelanguage.googleapis.com/v1beta"
 
 print("=== Liste des modèles Gemini disponibles ===")
 
 try:
-    models = client.models.list()
-    for m in models:
-        print(m.name)
+    params = {}
+    while True:
+        response = httpx.get(
+            f"{API_BASE}/models",
+            headers={"x-goog-api-key": os.getenv("GEMINI_API_KEY", "")},
+            params=params,
+            timeout=10.0,
+        )
+        response.raise_for_status()
+        page = response.json()
+        for m in page.get("models", []):
+            print(m["name"])
+        if not page.get("nextPageToken"):
+            break
+        params = {"pageToken": page["nextPageToken"]}
 except Exception as e:
     print(f"Erreur : {e}")
@@ -1,7 +1,17 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy import text
 
-from .database import create_db_tables_if_not_exists
+from .database import (
+    SCHEMA_UPGRADE_LOCK_ID,
+    SessionLocal,
+    create_db_tables_if_not_exists,
+    engine,
+)
+from .crud import feasibility, ingredient_catalog, recipe_dedupe, recipe_similarity
+from .crud.public_recipe_cache import invalidation_listener
+from .crud.recipe_generator import gemini_http
+from .utils.loop_monitor import loop_monitor
 from .routers import (
     auth,
     ingredients,
@@ -13,6 +23,7 @@ from .routers import (
     admin,    # Admin router
     landing,  # Landing CMS/public
     news,     # News (public + admin)
+    export,   # Data export (NDJSON / CSV)
 )
 
 # --------------------------------------------------------------------
@@ -45,6 +56,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination par curseur de GET /api/recipes/ + GET conditionnels
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 # --------------------------------------------------------------------
@@ -55,6 +68,53 @@ def on_startup() -> None:
     """Création des tables si elles n'existent pas."""
     create_db_tables_if_not_exists()
 
+    # Normalise les quantités des lignes créées avant le registre d'unités,
+    # puis rattache les anciennes lignes au catalogue d'ingrédients.
+    # Un seul worker à la fois : le verrou est tenu par une transaction à part
+    # (les backfills committent par lot), les suivants n'ont plus rien à faire.
+    with engine.begin() as lock:
+        lock.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SCHEMA_UPGRADE_LOCK_ID})
+        db = SessionLocal()
+        try:
+            feasibility.backfill_base_quantities(db)
+            ingredient_catalog.ensure_default_synonyms(db)
+            ingredient_catalog.backfill_catalog_ids(db)
+            # Index de similarité + empreintes des recettes pas encore traitées
+            recipe_similarity.index_missing(db)
+            recipe_dedupe.fingerprint_missing(db)
+        finally:
+            db.close()
+
+    # Invalidation du cache des recettes publiques entre workers (LISTEN/NOTIFY)
+    invalidation_listener.start()
+
+
+@app.on_event("startup")
+def start_http_clients() -> None:
+    # Client HTTP partagé (keep-alive) pour l'API Gemini
+    gemini_http.start()
+
+
+@app.on_event("startup")
+async def start_loop_monitor() -> None:
+    # Mesure du retard de la boucle d'événements (appels bloquants)
+    loop_monitor.start()
+
+
+@app.on_event("shutdown")
+async def stop_loop_monitor() -> None:
+    await loop_monitor.stop()
+
+
+@app.on_event("shutdown")
+def on_shutdown() -> None:
+    invalidation_listener.stop()
+
+
+@app.on_event("shutdown")
+async def close_http_clients() -> None:
+    await gemini_http.aclose()
+
 
 # --------------------------------------------------------------------
 # Endpoint de santé
@@ -79,6 +139,10 @@ app.include_router(recipes.router, prefix="/api")
 # Listes de courses
 app.include_router(shopping_lists.router, prefix="/api")
 
+# Export des données de l'utilisateur
+# => /api/export?format=ndjson|csv
+app.include_router(export.router, prefix="/api")
+
 # Seed global (données de démo)
 # => /api/seed/
 app.include_router(seed.router, prefix="/api")
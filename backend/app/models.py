@@ -1,6 +1,9 @@
 from sqlalchemy import (
     Column,
     Integer,
+    BigInteger,
+    SmallInteger,
+    LargeBinary,
     String,
     Boolean,
     ForeignKey,
@@ -8,12 +11,19 @@ from sqlalchemy import (
     Float,
     Date,
     Text,
+    Index,
+    Computed,
+    JSON,
+    event,
+    inspect,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql.expression import text
 from sqlalchemy.sql.functions import func
 
-from .database import Base
+from .database import Base, RECIPE_SEARCH_DOCUMENT
+from .utils import units
 
 # ====================================================================
 # AUTHENTICATION & USER MODELS
@@ -62,6 +72,40 @@ class User(Base):
     )
 
 
+# ====================================================================
+# INGREDIENT CATALOG (canonical names, aliases, synonyms)
+# ====================================================================
+
+
+class IngredientCatalog(Base):
+    __tablename__ = "ingredient_catalog"
+
+    id = Column(Integer, primary_key=True, index=True)
+    canonical_name = Column(String, nullable=False, unique=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    aliases = relationship(
+        "IngredientAlias",
+        back_populates="catalog",
+        cascade="all, delete-orphan",
+    )
+
+
+class IngredientAlias(Base):
+    __tablename__ = "ingredient_aliases"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Normalized free-text name (lowercase, single spaces)
+    alias = Column(String, nullable=False, unique=True)
+
+    catalog_id = Column(
+        Integer,
+        ForeignKey("ingredient_catalog.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    catalog = relationship("IngredientCatalog", back_populates="aliases")
+
+
 # ====================================================================
 # INGREDIENT MODEL (Inventory)
 # ====================================================================
@@ -76,7 +120,16 @@ class Ingredient(Base):
     location = Column(String, nullable=False)
     quantity = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
+    # Quantity converted to the canonical unit (g / ml / pcs), set on write
+    base_quantity = Column(Float, nullable=True)
+    base_unit = Column(String, nullable=True)
     expiry_date = Column(Date, nullable=True)
+    # Resolved entry of the global ingredient catalog, set on write
+    catalog_id = Column(
+        Integer,
+        ForeignKey("ingredient_catalog.id", ondelete="SET NULL"),
+        nullable=True,
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True),
@@ -92,6 +145,11 @@ class Ingredient(Base):
     )
     owner = relationship("User", back_populates="ingredients")
 
+    __table_args__ = (
+        Index("ix_ingredients_owner_id", owner_id),
+        Index("ix_ingredients_owner_catalog", owner_id, catalog_id),
+    )
+
 
 # ====================================================================
 # RECIPE MODEL
@@ -120,6 +178,21 @@ class Recipe(Base):
         onupdate=func.now(),
     )
 
+    # Full-text document maintained by PostgreSQL (never loaded by default)
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(RECIPE_SEARCH_DOCUMENT, persisted=True))
+    )
+
+    # Near-duplicate detection (app/crud/recipe_dedupe.py), set on write:
+    # hash of the normalized title + catalog ingredient set, and the older
+    # recipe this one duplicates (if any)
+    fingerprint = Column(BigInteger, nullable=True)
+    duplicate_of_id = Column(
+        Integer,
+        ForeignKey("recipes.id", ondelete="SET NULL"),
+        nullable=True,
+    )
+
     # Foreign key to the user (creator/owner)
     owner_id = Column(
         Integer,
@@ -135,6 +208,19 @@ class Recipe(Base):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        # Keyset pagination of GET /recipes/ (newest first)
+        Index("ix_recipes_created_at_id", created_at, id),
+        Index("ix_recipes_search_vector", search_vector, postgresql_using="gin"),
+        Index(
+            "ix_recipes_title_trgm",
+            title,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index("ix_recipes_fingerprint", fingerprint),
+    )
+
 
 # ====================================================================
 # RECIPE INGREDIENT MODEL
@@ -157,9 +243,114 @@ class RecipeIngredient(Base):
     name = Column(String, nullable=False)
     quantity = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
+    # Quantity converted to the canonical unit (g / ml / pcs), set on write
+    base_quantity = Column(Float, nullable=True)
+    base_unit = Column(String, nullable=True)
+    # Resolved entry of the global ingredient catalog, set on write
+    catalog_id = Column(
+        Integer,
+        ForeignKey("ingredient_catalog.id", ondelete="SET NULL"),
+        nullable=True,
+    )
 
     recipe = relationship("Recipe", back_populates="required_ingredients")
 
+    __table_args__ = (
+        Index("ix_recipe_ingredients_recipe_id", recipe_id),
+        # Inverted index: catalog ingredient -> recipes using it
+        Index("ix_recipe_ingredients_catalog_id", catalog_id, recipe_id),
+    )
+
+
+@event.listens_for(Ingredient, "before_insert")
+@event.listens_for(Ingredient, "before_update")
+@event.listens_for(RecipeIngredient, "before_insert")
+@event.listens_for(RecipeIngredient, "before_update")
+def _normalize_quantity(mapper, connection, target) -> None:
+    """Keep base_quantity / base_unit in sync with quantity / unit."""
+    target.base_quantity, target.base_unit = units.to_base(target.quantity, target.unit)
+
+
+# ====================================================================
+# RECIPE SIMILARITY INDEX (MinHash / LSH over catalog ingredients)
+# ====================================================================
+
+
+class RecipeMinHash(Base):
+    """MinHash signature of a recipe's set of catalog ingredients."""
+    __tablename__ = "recipe_minhash"
+
+    recipe_id = Column(
+        Integer,
+        ForeignKey("recipes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # utils.minhash.NUM_PERM little-endian uint32 values (empty: no ingredient)
+    signature = Column(LargeBinary, nullable=False)
+    ingredient_count = Column(Integer, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+
+class RecipeLshBucket(Base):
+    """One LSH band key of a recipe: recipes sharing a key are candidates."""
+    __tablename__ = "recipe_lsh_buckets"
+
+    recipe_id = Column(
+        Integer,
+        ForeignKey("recipes.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index("ix_recipe_lsh_buckets_band_bucket", band, bucket, recipe_id),
+    )
+
+
+# ====================================================================
+# GENERATED RECIPE CACHE (shared tier, app/crud/generation_cache.py)
+# ====================================================================
+
+
+class GeneratedRecipeCache(Base):
+    """Recipe generated by Gemini for one inventory fingerprint."""
+    __tablename__ = "generated_recipe_cache"
+
+    fingerprint = Column(String(64), primary_key=True)
+    recipe = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_generated_recipe_cache_expires_at", expires_at),
+    )
+
+
+# ====================================================================
+# DATA VERSIONS (cache freshness, app/crud/data_versions.py)
+# ====================================================================
+
+
+class DataVersion(Base):
+    """
+    Version counter of a slice of data, bumped by database triggers
+    (database.SCHEMA_UPGRADES) at most once per writing transaction:
+    ("inventory", owner_id) for a user's ingredients, ("recipes", owner_id)
+    for their recipes, ("public", owner_id) for their public recipes.
+    """
+    __tablename__ = "data_versions"
+
+    scope = Column(String(32), primary_key=True)
+    owner_id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+    # Last transaction that bumped the row
+    txid = Column(BigInteger, nullable=True)
+
 
 # ====================================================================
 # SHOPPING LIST MODEL
@@ -172,6 +363,11 @@ class ShoppingList(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
 
     owner_id = Column(
         Integer,
@@ -201,7 +397,18 @@ class ShoppingItem(Base):
     quantity = Column(Float, nullable=False, default=1.0)
     unit = Column(String, nullable=False)
     is_purchased = Column(Boolean, nullable=False, default=False)
+    # Resolved entry of the global ingredient catalog, set on write
+    catalog_id = Column(
+        Integer,
+        ForeignKey("ingredient_catalog.id", ondelete="SET NULL"),
+        nullable=True,
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
 
     shopping_list_id = Column(
         Integer,
@@ -210,6 +417,27 @@ class ShoppingItem(Base):
     )
     shopping_list = relationship("ShoppingList", back_populates="items")
 
+    __table_args__ = (
+        Index("ix_shopping_items_list_catalog", shopping_list_id, catalog_id),
+    )
+
+
+@event.listens_for(Ingredient, "before_insert")
+@event.listens_for(Ingredient, "before_update")
+@event.listens_for(RecipeIngredient, "before_insert")
+@event.listens_for(RecipeIngredient, "before_update")
+@event.listens_for(ShoppingItem, "before_insert")
+@event.listens_for(ShoppingItem, "before_update")
+def _resolve_catalog_id(mapper, connection, target) -> None:
+    """Resolve the free-text name to a catalog id when it is new or changed."""
+    # Local import: the crud package imports this module
+    from .crud.ingredient_catalog import resolve_catalog_id
+
+    name_attr = "item_name" if isinstance(target, ShoppingItem) else "name"
+    name_changed = inspect(target).attrs[name_attr].history.has_changes()
+    if target.catalog_id is None or name_changed:
+        target.catalog_id = resolve_catalog_id(connection, getattr(target, name_attr))
+
 
 # ====================================================================
 # LANDING CONTENT MODEL (CMS simple)
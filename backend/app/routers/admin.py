@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import List
+from typing import Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy import func
@@ -7,6 +7,12 @@ from sqlalchemy.orm import Session
 
 from .. import models, auth, schemas_admin
 from ..database import get_db
+from ..gemini_service import gemini_flight
+from ..crud.feasibility_cache import feasibility_cache
+from ..crud.generation_cache import generation_cache
+from ..crud.public_recipe_cache import public_recipe_cache, recipes_changed
+from ..crud.recipe_generator import gemini_http
+from ..utils.loop_monitor import loop_monitor
 
 
 router = APIRouter(
@@ -178,11 +184,70 @@ def delete_user(
     # 2) Supprimer l'utilisateur
     db.delete(user)
     db.commit()
+    # Ses recettes partent en cascade : caches des autres workers aussi
+    recipes_changed(db)
 
     # 3) Réponse vide 204 (le frontend s'en fiche du body)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+# --------------------------------------------------------------------
+# Caches / outbound HTTP clients (admin only)
+# --------------------------------------------------------------------
+
+
+@router.get("/cache-stats", response_model=Dict[str, schemas_admin.CacheStats])
+def get_cache_stats(
+    current_admin: models.User = Depends(auth.get_current_admin_user),
+):
+    """
+    Hit / miss counters of the in-process caches (admin only).
+    Counters are per gunicorn worker.
+    """
+    return {
+        "feasibility": feasibility_cache.stats(),
+        "public_recipes": public_recipe_cache.stats(),
+        "generated_recipes": generation_cache.stats(),
+    }
+
+
+@router.get("/http-stats", response_model=Dict[str, schemas_admin.HttpClientStats])
+def get_http_stats(
+    current_admin: models.User = Depends(auth.get_current_admin_user),
+):
+    """
+    Connection reuse of the pooled outbound HTTP clients (admin only).
+    Counters are per gunicorn worker.
+    """
+    return {
+        "gemini": gemini_http.stats(),
+    }
+
+
+@router.get("/loop-stats", response_model=schemas_admin.EventLoopStats)
+def get_loop_stats(
+    current_admin: models.User = Depends(auth.get_current_admin_user),
+):
+    """
+    Event-loop lag of the worker answering (admin only): how late a
+    periodic timer fires, i.e. how long the loop was blocked.
+    """
+    return loop_monitor.stats()
+
+
+@router.get("/single-flight-stats", response_model=Dict[str, schemas_admin.SingleFlightStats])
+def get_single_flight_stats(
+    current_admin: models.User = Depends(auth.get_current_admin_user),
+):
+    """
+    Identical concurrent /ai calls served by one upstream call (admin only).
+    Counters are per gunicorn worker.
+    """
+    return {
+        "gemini": gemini_flight.stats(),
+    }
+
+
 # --------------------------------------------------------------------
 # Landing page CMS (admin only)
 # --------------------------------------------------------------------
@@ -1,12 +1,20 @@
 from fastapi import APIRouter, Query, HTTPException
-from app.gemini_service import ask_gemini
+from app.gemini_service import ask_gemini, gemini_flight
 
 # ✅ Router without local prefix — the /api/ai prefix is added in main.py
 router = APIRouter(tags=["AI"])
 
 
+async def ask_gemini_once(prompt: str) -> str:
+    """
+    ask_gemini, coalesced: concurrent requests with the same prompt (a
+    popular prompt going around) share one upstream call and its result.
+    """
+    return await gemini_flight.do(prompt, lambda: ask_gemini(prompt))
+
+
 @router.get("/recipe")
-def generate_recipe(
+async def generate_recipe(
     ingredients: str = Query(
         ...,
         description="Comma-separated list of ingredients"
@@ -23,7 +31,7 @@ def generate_recipe(
     )
 
     try:
-        result = ask_gemini(prompt)
+        result = await ask_gemini_once(prompt)
         # NOTE: Keep the JSON keys for backward compatibility with the frontend
         return {"ingredients": ingredients, "recette": result}
     except Exception as e:
@@ -34,7 +42,7 @@ def generate_recipe(
 
 
 @router.get("/ask")
-def ask_general(
+async def ask_general(
     question: str = Query(
         ...,
         description="Question to ask the AI"
@@ -47,7 +55,7 @@ def ask_general(
         /api/ai/ask?question=Explain quantum mechanics in simple terms
     """
     try:
-        result = ask_gemini(question)
+        result = await ask_gemini_once(question)
         # NOTE: Keep the JSON keys for backward compatibility with the frontend
         return {"question": question, "réponse": result}
     except Exception as e:
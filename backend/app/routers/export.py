@@ -0,0 +1,36 @@
+# 📁 backend/app/routers/export.py
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from .. import models, auth
+from ..crud.export import MEDIA_TYPES, ExportFormat, stream_export
+
+router = APIRouter(
+    prefix="/export",
+    tags=["Export"],
+)
+
+
+@router.get("")
+def export_user_data(
+    format: ExportFormat = Query("ndjson", description="ndjson or csv"),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Download all of the current user's recipes (with their ingredients),
+    inventory ingredients and shopping lists (with their items).
+
+    The body is streamed from server-side cursors, so exports of any size
+    use constant memory; see crud/export.py for the record layout.
+    """
+    filename = f"grocerymate-export-{date.today().isoformat()}.{format}"
+    return StreamingResponse(
+        stream_export(current_user.id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "Cache-Control": "no-store",
+        },
+    )
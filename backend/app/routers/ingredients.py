@@ -6,21 +6,34 @@
 from typing import List, Optional
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..database import get_db
 from .. import models, schemas
 from ..auth import get_current_active_user  # authentication dependency
+from ..crud.feasibility_cache import feasibility_cache
+from ..utils.etag import etag_matches, make_etag, not_modified, set_etag
 
 router = APIRouter(prefix="/ingredients", tags=["ingredients"])
 
 
+def _inventory_stamp(db: Session, user_id: int):
+    """(row count, max(updated_at)) of the user's inventory: one aggregate query."""
+    return db.execute(
+        select(func.count(models.Ingredient.id), func.max(models.Ingredient.updated_at))
+        .filter(models.Ingredient.owner_id == user_id)
+    ).one()
+
+
 # ------------------------------------------------------------
 # LIST INGREDIENTS FOR CURRENT USER
 # ------------------------------------------------------------
 @router.get("/", response_model=List[schemas.Ingredient])
 def get_ingredients(
+    request: Request,
+    response: Response,
     location: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
@@ -28,7 +41,13 @@ def get_ingredients(
     """
     Return all ingredients belonging to the current user.
     Optional filter by location.
+    Supports If-None-Match (304 when the inventory did not change).
     """
+    etag = make_etag("ingredients", current_user.id, location, *_inventory_stamp(db, current_user.id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     query = db.query(models.Ingredient).filter(
         models.Ingredient.owner_id == current_user.id
     )
@@ -44,6 +63,8 @@ def get_ingredients(
 # ------------------------------------------------------------
 @router.get("/expiring/soon", response_model=List[schemas.Ingredient])
 def get_expiring_soon(
+    request: Request,
+    response: Response,
     days: int = 7,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
@@ -54,6 +75,13 @@ def get_expiring_soon(
     """
     expiry_threshold = datetime.now().date() + timedelta(days=days)
 
+    etag = make_etag(
+        "expiring", current_user.id, expiry_threshold, *_inventory_stamp(db, current_user.id)
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     ingredients = (
         db.query(models.Ingredient)
         .filter(
@@ -115,6 +143,7 @@ def seed_ingredients(
         db.add(db_item)
 
     db.commit()
+    feasibility_cache.invalidate(current_user.id)
     return {"message": f"Sample ingredients seeded successfully for user {current_user.id}"}
 
 
@@ -169,6 +198,7 @@ def create_ingredient(
     db.add(db_ingredient)
     db.commit()
     db.refresh(db_ingredient)
+    feasibility_cache.ingredient_written(db, db_ingredient)
     return db_ingredient
 
 
@@ -185,11 +215,14 @@ def update_ingredient(
     """
     Update an ingredient if it belongs to the current user.
     """
-    ingredient_query = db.query(models.Ingredient).filter(
-        models.Ingredient.id == ingredient_id,
-        models.Ingredient.owner_id == current_user.id,
+    db_ingredient = (
+        db.query(models.Ingredient)
+        .filter(
+            models.Ingredient.id == ingredient_id,
+            models.Ingredient.owner_id == current_user.id,
+        )
+        .first()
     )
-    db_ingredient = ingredient_query.first()
 
     if not db_ingredient:
         raise HTTPException(
@@ -197,11 +230,18 @@ def update_ingredient(
             detail="Ingredient not found or does not belong to user",
         )
 
+    # ORM attribute updates (not query.update) so the unit normalization
+    # hook recomputes base_quantity / base_unit
+    old_catalog_id = db_ingredient.catalog_id
     update_data = ingredient.model_dump(exclude_unset=True)
-    ingredient_query.update(update_data, synchronize_session=False)
+    for field, value in update_data.items():
+        setattr(db_ingredient, field, value)
+    # Always write the row, so the inventory version moves even for a no-op edit
+    db_ingredient.updated_at = func.now()
 
     db.commit()
     db.refresh(db_ingredient)
+    feasibility_cache.ingredient_written(db, db_ingredient, old_catalog_id=old_catalog_id)
     return db_ingredient
 
 
@@ -222,12 +262,15 @@ def delete_ingredient(
         models.Ingredient.owner_id == current_user.id,
     )
 
-    if not ingredient_query.first():
+    db_ingredient = ingredient_query.first()
+    if not db_ingredient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Ingredient not found or does not belong to user",
         )
 
+    catalog_id = db_ingredient.catalog_id
     ingredient_query.delete(synchronize_session=False)
     db.commit()
+    feasibility_cache.ingredient_deleted(db, current_user.id, catalog_id)
     return
@@ -1,16 +1,30 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal, Union
+import logging
 import json
 import copy
+import base64
+from datetime import datetime
 
-from fastapi import Depends, APIRouter, status, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_
+from fastapi import Depends, APIRouter, status, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, load_only, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import func, or_, select, tuple_, update
 
 from .. import models, schemas, auth
 from ..database import get_db
 # Direct import of the function from the submodule
 from ..crud.recipe_generator import generate_recipe_from_ingredients
+from ..crud import data_versions, feasibility, recipe_dedupe, recipe_import, recipe_search, recipe_similarity
+from ..crud.recipe_ingredients import apply_ingredient_diff
+from ..crud.feasibility_cache import feasibility_cache
+from ..crud.public_recipe_cache import public_recipe_cache, recipes_changed
+from ..crud.generation_cache import generation_cache, inventory_fingerprint
+from ..utils.etag import etag_matches, make_etag, not_modified, set_etag
+
+logger = logging.getLogger(__name__)
 
 # Router initialization
 router = APIRouter(
@@ -32,42 +46,265 @@ def get_recipe_or_404(db: Session, recipe_id: int) -> models.Recipe:
     return recipe
 
 
+def visible_recipes_clause(current_user: Optional[models.User]):
+    """Public recipes, plus the user's own recipes when logged in."""
+    if current_user:
+        return or_(
+            models.Recipe.owner_id == current_user.id,
+            models.Recipe.is_public == True,
+        )
+    return models.Recipe.is_public == True
+
+
+def recipes_stamp(db: Session, current_user: Optional[models.User]):
+    """
+    ETag input for the listing: versions of the user's own recipes and of the
+    public catalog (crud/data_versions.py), two indexed reads, no aggregate
+    over the recipes table.
+    """
+    return data_versions.catalog_versions(db, current_user.id if current_user else None)
+
+
+def encode_list_cursor(recipe: models.Recipe) -> str:
+    """Opaque cursor for GET /recipes/: (created_at, id) of the last item."""
+    raw = json.dumps({"c": recipe.created_at.isoformat(), "id": recipe.id}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_list_cursor(cursor: str):
+    """Inverse of encode_list_cursor. Raises HTTP 400 on a malformed cursor."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(data["c"]), int(data["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        ) from e
+
+
+# --------------------------------------------------------------------
+# ADVANCED LOGIC: INVENTORY CHECK
+# NOTE: static paths must be declared before "/{recipe_id}"
+# --------------------------------------------------------------------
+
+
+@router.get(
+    "/check-inventory",
+    response_model=List[schemas.InventoryCheckResponse],
+    summary="Identify which recipes can be made with the current inventory",
+)
+def check_recipes_feasibility(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Check which recipes are feasible for the user given their current inventory.
+
+    Only recipes sharing at least one ingredient with the inventory are
+    evaluated (inverted index on recipe ingredient catalog ids), so recipes
+    without any required ingredient are not listed. Results are cached per
+    user and updated incrementally by the ingredient / recipe write paths.
+    """
+    return feasibility_cache.get(db, current_user.id)
+
+
+@router.post(
+    "/check-inventory/batch",
+    response_model=List[schemas.InventoryCheckResponse],
+    summary="Check feasibility for an explicit list of recipe IDs",
+)
+def check_recipes_feasibility_batch(
+    payload: schemas.InventoryCheckBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Evaluate up to 50 specific recipes (detail page, meal plan) in one pass.
+    Recipes that do not exist or are not accessible are omitted.
+    """
+    return feasibility.check_feasibility_batch(db, current_user.id, payload.recipe_ids)
+
+
+@router.get(
+    "/check-inventory/summary",
+    response_model=List[schemas.InventoryCheckSummary],
+    summary="Per-recipe have/need counts computed in one SQL statement",
+)
+def check_recipes_feasibility_summary(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Set-based variant of /check-inventory: the whole evaluation runs in
+    PostgreSQL and only returns have/need counts and shortfalls per recipe.
+    """
+    return feasibility.check_feasibility_sql(db, current_user.id)
+
+
+@router.get(
+    "/check-inventory/top",
+    response_model=schemas.RankedRecipePage,
+    summary="Best recipes to cook now (coverage + expiry urgency)",
+)
+def get_top_recipes(
+    k: int = Query(10, ge=1, le=50),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Return the k best recipes for the current inventory, ranked by coverage
+    of the required ingredients and urgency of the expiring items they use.
+    Pass `next_cursor` back as `cursor` to get the next page.
+    """
+    try:
+        return feasibility.rank_feasible_recipes(db, current_user.id, k=k, cursor=cursor)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor.",
+        )
+
+
 # --- CRUD endpoints ---
 
 
-@router.get("/", response_model=List[schemas.RecipeOut])
+# Columns needed by schemas.RecipeSummary (instructions are never loaded)
+SUMMARY_COLUMNS = (
+    models.Recipe.id,
+    models.Recipe.owner_id,
+    models.Recipe.title,
+    models.Recipe.description,
+    models.Recipe.prep_time,
+    models.Recipe.cook_time,
+    models.Recipe.servings,
+    models.Recipe.calories,
+    models.Recipe.is_healthy,
+    models.Recipe.is_public,
+    models.Recipe.created_at,
+)
+
+
+# The list is rendered with the adapter matching `view` (never a union that
+# could silently fall back to summaries); response_model only documents it
+FULL_LIST_ADAPTER = TypeAdapter(List[schemas.RecipeOut])
+SUMMARY_LIST_ADAPTER = TypeAdapter(List[schemas.RecipeSummary])
+
+
+@router.get("/", response_model=Union[List[schemas.RecipeOut], List[schemas.RecipeSummary]])
 def get_all_recipes(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=500),
     skip: int = 0,
+    cursor: Optional[str] = None,
     search: Optional[str] = "",
+    with_ingredients: Optional[str] = Query(None, alias="with"),
+    without_ingredients: Optional[str] = Query(None, alias="without"),
+    view: Literal["full", "summary"] = "full",
     current_user: Optional[models.User] = Depends(auth.get_current_user_optional),
 ):
     """
     Retrieve recipes. Show public recipes AND the private recipes of the logged-in user.
+
+    Recipes are ordered newest first by (created_at, id). The body stays a
+    plain list; when more recipes exist, the X-Next-Cursor header carries an
+    opaque cursor to pass back as `cursor` (keyset pagination on
+    ix_recipes_created_at_id: deep pages cost the same as the first one).
+    `skip` is kept for older clients and ignored when `cursor` is given.
+
+    `search` runs a full-text query over title, description and instructions,
+    ordered by relevance, with a trigram fallback on titles for misspellings
+    (see crud/recipe_search.py). Search results are paginated with `skip`.
+
+    `with` / `without` (e.g. with=chicken,tomato&without=nuts) keep recipes
+    containing all of the first ingredients and none of the second, through
+    the catalog id index; they combine with every other parameter.
+
+    view=full (default): complete recipes; the ingredients of the whole page
+    are loaded in one extra query (selectinload) instead of one per recipe.
+    view=summary: no instructions and no ingredient list, for grid views.
+
+    Anonymous responses are served from the public recipe cache
+    (crud/public_recipe_cache.py). Supports If-None-Match: the weak ETag is
+    derived from the version counters of the visible recipes (recipes_stamp).
     """
+    params = (view, limit, skip, cursor, search, with_ingredients, without_ingredients)
+    cache_key = None
+    if current_user is None:
+        cache_key = ("list",) + params
+        cached = public_recipe_cache.get(cache_key)
+        if cached is not None:
+            if etag_matches(request, cached.headers.get("ETag")):
+                return not_modified(cached.headers["ETag"])
+            return cached.to_response()
+        generation = public_recipe_cache.generation
+
+    etag = make_etag(
+        "recipes",
+        current_user.id if current_user else "anonymous",
+        *params,
+        *recipes_stamp(db, current_user),
+    )
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
 
     query = db.query(models.Recipe)
+    if view == "summary":
+        query = query.options(load_only(*SUMMARY_COLUMNS))
+    else:
+        query = query.options(selectinload(models.Recipe.required_ingredients))
 
     # --- Security / visibility logic ---
-    if current_user:
-        # Show recipes owned by the user AND public recipes
+    # Logged in: own recipes AND public recipes; anonymous: public recipes only
+    query = query.filter(visible_recipes_clause(current_user))
+
+    # Contained ingredients (comma-separated names, matched through the catalog)
+    with_terms = recipe_search.parse_terms(with_ingredients)
+    without_terms = recipe_search.parse_terms(without_ingredients)
+    if with_terms or without_terms:
+        query = recipe_search.ingredient_filter(query, with_terms, without_terms)
+
+    # Search: relevance-ranked, paginated with skip (no cursor)
+    search = (search or "").strip()
+    if query is None:
+        recipes = []
+    elif search:
+        recipes = recipe_search.search_recipes(query, search, limit, skip)
+    else:
+        recipes = _list_page(query, response, limit, skip, cursor)
+
+    adapter = SUMMARY_LIST_ADAPTER if view == "summary" else FULL_LIST_ADAPTER
+    body = adapter.dump_json(adapter.validate_python(recipes, from_attributes=True))
+    headers = {
+        name: response.headers[name]
+        for name in ("ETag", "Cache-Control", "X-Next-Cursor")
+        if name in response.headers
+    }
+    if cache_key is not None:
+        return public_recipe_cache.put(cache_key, body, headers, generation).to_response()
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _list_page(query, response: Response, limit: int, skip: int, cursor: Optional[str]):
+    """Newest-first page of `query`, keyset-paginated on (created_at, id)."""
+    query = query.order_by(models.Recipe.created_at.desc(), models.Recipe.id.desc())
+    if cursor:
+        created_at, last_id = decode_list_cursor(cursor)
         query = query.filter(
-            or_(
-                models.Recipe.owner_id == current_user.id,
-                models.Recipe.is_public == True,
-            )
+            tuple_(models.Recipe.created_at, models.Recipe.id) < (created_at, last_id)
         )
-    else:
-        # Only public recipes for unauthenticated users
-        query = query.filter(models.Recipe.is_public == True)
-
-    # Filtering by search term
-    if search:
-        query = query.filter(models.Recipe.title.ilike(f"%{search}%"))
-
-    recipes = query.limit(limit).offset(skip).all()
-
+    elif skip:
+        query = query.offset(skip)
+
+    # One extra row tells whether a next page exists
+    recipes = query.limit(limit + 1).all()
+    if len(recipes) > limit:
+        recipes = recipes[:limit]
+        response.headers["X-Next-Cursor"] = encode_list_cursor(recipes[-1])
     return recipes
 
 
@@ -97,6 +334,12 @@ def create_recipe(
             )
             db.add(req_ing)
 
+        db.flush()
+        catalog_ids = recipe_similarity.index_recipes(db, [new_recipe.id])[new_recipe.id]
+        # 3. Fingerprint + near-duplicate flag (against recipes the author can see)
+        new_recipe.fingerprint, new_recipe.duplicate_of_id = recipe_dedupe.check_recipe(
+            db, new_recipe.id, new_recipe.title, catalog_ids, visible_recipes_clause(current_user)
+        )
         db.commit()
         db.refresh(new_recipe)
 
@@ -107,29 +350,210 @@ def create_recipe(
             detail="Database integrity error. Please check required fields.",
         )
 
+    feasibility_cache.recipe_written(db, new_recipe)
+    recipes_changed(db, new_recipe.id)
     return new_recipe
 
 
+@router.post("/bulk", response_model=schemas.BulkImportResult)
+async def bulk_import_recipes(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_active_user),
+):
+    """
+    Import recipes from an NDJSON body (one RecipeCreate JSON object per line).
+
+    The body is streamed; each line is validated on its own and invalid lines
+    are reported with their line number. Valid recipes are written in batches
+    of recipe_import.BATCH_SIZE (multi-row INSERT ... RETURNING), off the
+    event loop. Exact duplicates (of the user's recipes or of earlier lines)
+    are skipped and listed in `duplicates`.
+
+    Past recipe_import.MAX_LINES lines the rest of the body is not read and
+    the result is returned with `truncated` set. A line longer than
+    recipe_import.MAX_LINE_BYTES aborts the import with 413.
+    """
+    owner_id = current_user.id
+    result = schemas.BulkImportResult(created=0, failed=0)
+
+    def report(line_number: int, detail: str) -> None:
+        result.failed += 1
+        if len(result.errors) < recipe_import.MAX_REPORTED_ERRORS:
+            result.errors.append(schemas.BulkImportError(line=line_number, detail=detail))
+
+    # fingerprint -> line number of the recipes written so far
+    seen: Dict[int, int] = {}
+
+    async def flush(batch) -> None:
+        ids, failed, skipped = await run_in_threadpool(
+            recipe_import.insert_batch, db, owner_id, batch, seen
+        )
+        for line_number, detail in failed:
+            report(line_number, detail)
+        result.created += len(ids)
+        result.recipe_ids.extend(ids)
+        result.skipped += len(skipped)
+        for line_number, detail in skipped:
+            if len(result.duplicates) < recipe_import.MAX_REPORTED_ERRORS:
+                result.duplicates.append(schemas.BulkImportError(line=line_number, detail=detail))
+
+    batch: List = []
+    line_number = 0
+
+    async def handle(raw: bytes) -> None:
+        nonlocal batch, line_number
+        line_number += 1
+        if not raw.strip():
+            return
+        if line_number > recipe_import.MAX_LINES:
+            # Stop reading: the lines before are imported and reported as usual
+            result.truncated = True
+            report(line_number, f"Import truncated: at most {recipe_import.MAX_LINES} lines per import.")
+            return
+        try:
+            batch.append((line_number, recipe_import.parse_line(raw)))
+        except ValueError as e:
+            report(line_number, str(e))
+            return
+        if len(batch) >= recipe_import.BATCH_SIZE:
+            await flush(batch)
+            batch = []
+
+    def line_too_long() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Line {line_number + 1} is longer than {recipe_import.MAX_LINE_BYTES} bytes.",
+        )
+
+    # Every byte is scanned once: only the new chunk is searched for newlines
+    buffer = bytearray()
+    try:
+        async for chunk in request.stream():
+            start = 0
+            while not result.truncated:
+                end = chunk.find(b"\n", start)
+                if end == -1:
+                    break
+                buffer += chunk[start:end]
+                if len(buffer) > recipe_import.MAX_LINE_BYTES:
+                    raise line_too_long()
+                await handle(bytes(buffer))
+                buffer.clear()
+                start = end + 1
+            if result.truncated:
+                break
+            buffer += chunk[start:]
+            if len(buffer) > recipe_import.MAX_LINE_BYTES:
+                raise line_too_long()
+        if buffer and not result.truncated:
+            await handle(bytes(buffer))
+        await flush(batch)
+    finally:
+        # Batches are committed as they go: even an aborted import may have written some
+        if result.created:
+            feasibility_cache.invalidate()
+            await run_in_threadpool(recipes_changed, db)
+    return result
+
+
 @router.get("/{recipe_id}", response_model=schemas.RecipeOut)
 def get_recipe(
     recipe_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: Optional[models.User] = Depends(auth.get_current_user_optional),
 ):
-    """Retrieve a specific recipe by ID."""
-    recipe = get_recipe_or_404(db, recipe_id)
+    """
+    Retrieve a specific recipe by ID (anonymous reads go through the public cache).
+    Supports If-None-Match: the weak ETag comes from Recipe.updated_at, checked
+    before the recipe and its ingredients are loaded.
+    """
+    cache_key = ("recipe", recipe_id)
+    if current_user is None:
+        cached = public_recipe_cache.get(cache_key)
+        if cached is not None:
+            if etag_matches(request, cached.headers.get("ETag")):
+                return not_modified(cached.headers["ETag"])
+            return cached.to_response()
+        generation = public_recipe_cache.generation
+
+    header = db.execute(
+        select(models.Recipe.owner_id, models.Recipe.is_public, models.Recipe.updated_at)
+        .filter(models.Recipe.id == recipe_id)
+    ).first()
+    if header is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Recipe with ID {recipe_id} not found.",
+        )
 
     # --- Security / visibility logic ---
     # If the recipe is not public AND the user is not the owner
-    if not recipe.is_public and (not current_user or recipe.owner_id != current_user.id):
+    if not header.is_public and (not current_user or header.owner_id != current_user.id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Recipe not found or not authorized.",
         )
 
+    etag = make_etag("recipe", recipe_id, header.updated_at)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
+    recipe = get_recipe_or_404(db, recipe_id)
+    if current_user is None:
+        body = schemas.RecipeOut.model_validate(recipe).model_dump_json().encode()
+        headers = {name: response.headers[name] for name in ("ETag", "Cache-Control")}
+        return public_recipe_cache.put(cache_key, body, headers, generation).to_response()
     return recipe
 
 
+@router.get("/{recipe_id}/similar", response_model=List[schemas.SimilarRecipe])
+def get_similar_recipes(
+    recipe_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: Optional[models.User] = Depends(auth.get_current_user_optional),
+):
+    """
+    "More like this": visible recipes whose ingredient sets overlap the most
+    with this recipe's, from the MinHash / LSH index (see crud/recipe_similarity.py).
+    """
+    header = db.execute(
+        select(models.Recipe.owner_id, models.Recipe.is_public)
+        .filter(models.Recipe.id == recipe_id)
+    ).first()
+    if header is None or (
+        not header.is_public and (not current_user or header.owner_id != current_user.id)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recipe not found or not authorized.",
+        )
+
+    ranked = recipe_similarity.similar_recipe_ids(
+        db, recipe_id, visible_recipes_clause(current_user), limit
+    )
+    if not ranked:
+        return []
+    recipes = {
+        recipe.id: recipe
+        for recipe in db.query(models.Recipe)
+        .options(load_only(*SUMMARY_COLUMNS))
+        .filter(models.Recipe.id.in_([similar_id for similar_id, _ in ranked]))
+    }
+    return [
+        schemas.SimilarRecipe(
+            **schemas.RecipeSummary.model_validate(recipes[similar_id]).model_dump(),
+            similarity=round(similarity, 4),
+        )
+        for similar_id, similarity in ranked
+        if similar_id in recipes
+    ]
+
+
 @router.put("/{recipe_id}", response_model=schemas.RecipeOut)
 def update_recipe(
     recipe_id: int,
@@ -137,16 +561,23 @@ def update_recipe(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ):
-    """Update an existing recipe. Only the owner can modify it."""
+    """
+    Update an existing recipe. Only the owner can modify it.
 
-    recipe_query = (
+    When `required_ingredients` is given it is the full desired list: rows are
+    inserted / updated / deleted as a minimal diff (one bulk statement each),
+    so unchanged ingredients keep their ids. Everything runs in one
+    transaction and the response is built from the loaded state (no re-query).
+    """
+    recipe = (
         db.query(models.Recipe)
+        .options(selectinload(models.Recipe.required_ingredients))
         .filter(
             models.Recipe.id == recipe_id,
             models.Recipe.owner_id == current_user.id,  # Authorization check
         )
+        .first()
     )
-    recipe = recipe_query.first()
 
     if not recipe:
         raise HTTPException(
@@ -154,12 +585,65 @@ def update_recipe(
             detail=f"Recipe with ID {recipe_id} not found or not authorized.",
         )
 
-    # 1. Update main recipe fields (only fields that are set will be updated)
-    recipe_data = updated_recipe.model_dump(exclude_unset=True)
+    was_public = recipe.is_public
 
-    recipe_query.update(recipe_data, synchronize_session=False)
-    db.commit()
-    return recipe_query.first()
+    # 1. Update main recipe fields (only fields that are set will be updated);
+    # updated_at always moves so ETags / cache stamps see ingredient-only edits
+    recipe_data = updated_recipe.model_dump(
+        exclude_unset=True, exclude={"required_ingredients"}
+    )
+    try:
+        updated_at = db.execute(
+            update(models.Recipe)
+            .where(models.Recipe.id == recipe_id)
+            .values(**recipe_data, updated_at=func.now())
+            .returning(models.Recipe.updated_at)
+            .execution_options(synchronize_session=False)
+        ).scalar_one()
+        for field, value in {**recipe_data, "updated_at": updated_at}.items():
+            set_committed_value(recipe, field, value)
+
+        # 2. Ingredient diff
+        if updated_recipe.required_ingredients is not None:
+            try:
+                apply_ingredient_diff(db, recipe, updated_recipe.required_ingredients)
+            except ValueError as e:
+                db.rollback()
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        # 3. Similarity index, fingerprint and near-duplicate flag
+        if updated_recipe.required_ingredients is not None or "title" in recipe_data:
+            catalog_ids = {
+                row.catalog_id
+                for row in recipe.required_ingredients
+                if row.catalog_id is not None
+            }
+            if updated_recipe.required_ingredients is not None:
+                recipe_similarity.index_signatures(db, {recipe.id: catalog_ids})
+            fingerprint, duplicate_of_id = recipe_dedupe.check_recipe(
+                db, recipe.id, recipe.title, catalog_ids, visible_recipes_clause(current_user)
+            )
+            db.execute(
+                update(models.Recipe)
+                .where(models.Recipe.id == recipe_id)
+                .values(fingerprint=fingerprint, duplicate_of_id=duplicate_of_id, updated_at=updated_at)
+                .execution_options(synchronize_session=False)
+            )
+            set_committed_value(recipe, "fingerprint", fingerprint)
+            set_committed_value(recipe, "duplicate_of_id", duplicate_of_id)
+
+        result = schemas.RecipeOut.model_validate(recipe)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Database integrity error. Please check required fields.",
+        )
+
+    feasibility_cache.recipe_written(db, recipe, was_public=was_public)
+    recipes_changed(db, recipe_id)
+    return result
 
 
 @router.delete("/{recipe_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -178,14 +662,18 @@ def delete_recipe(
         )
     )
 
-    if not recipe_query.first():
+    recipe = recipe_query.first()
+    if not recipe:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Recipe not found or not authorized.",
         )
+    was_public = recipe.is_public
 
     recipe_query.delete(synchronize_session=False)
     db.commit()
+    feasibility_cache.recipe_deleted(db, recipe_id, current_user.id, was_public)
+    recipes_changed(db, recipe_id)
 
     return
 
@@ -195,33 +683,75 @@ def delete_recipe(
 # --------------------------------------------------------------------
 
 
+def inventory_snapshot(db: Session, user_id: int) -> List[Any]:
+    """
+    Inventory rows used by the generation prompt, as plain rows; the session
+    is closed afterwards so its pooled connection is returned before the
+    (slow) Gemini round-trip.
+    """
+    try:
+        # INTEGRITY FIX: Use 'owner_id' instead of 'user_id'
+        return db.execute(
+            select(
+                models.Ingredient.name,
+                models.Ingredient.quantity,
+                models.Ingredient.unit,
+                models.Ingredient.category,
+                models.Ingredient.expiry_date,
+                # Generation cache key (crud/generation_cache.py)
+                models.Ingredient.base_quantity,
+                models.Ingredient.base_unit,
+                models.IngredientCatalog.canonical_name,
+            )
+            .outerjoin(
+                models.IngredientCatalog,
+                models.IngredientCatalog.id == models.Ingredient.catalog_id,
+            )
+            .filter(models.Ingredient.owner_id == user_id)
+            .order_by(models.Ingredient.id)
+        ).all()
+    finally:
+        db.close()
+
+
 @router.post("/generate", status_code=status.HTTP_200_OK)
 async def generate_recipe(
+    fresh: bool = Query(False, description="Skip the cache and ask Gemini for a new idea"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_active_user),
 ) -> Dict[str, Any]:
     """
     Generate a structured recipe based on the user's inventory via the Gemini API.
+
+    Async endpoint: the (blocking) inventory query runs in the threadpool so
+    the event loop keeps serving other requests meanwhile, and no database
+    connection is held while waiting on Gemini (the request session, shared
+    with the auth dependency, is closed once the snapshot is read). A
+    follow-up write must open its own short session.
+
+    Results are cached per normalized inventory (crud/generation_cache.py);
+    `fresh=true` bypasses the lookup and replaces the cached recipe.
     """
     user_id = current_user.id
 
-    # 1. Retrieve all ingredients owned by the user (inventory)
-    # INTEGRITY FIX: Use 'owner_id' instead of 'user_id'
-    user_ingredients = (
-        db.query(models.Ingredient)
-        .filter(models.Ingredient.owner_id == user_id)
-        .all()
-    )
+    # 1. Snapshot of the user's inventory, off the loop; connection released
+    user_ingredients = await run_in_threadpool(inventory_snapshot, db, user_id)
+
+    cache_key = inventory_fingerprint(user_ingredients)
+    if not fresh:
+        cached = generation_cache.get_local(cache_key) or await run_in_threadpool(
+            generation_cache.get_shared, cache_key
+        )
+        if cached is not None:
+            return {
+                "status": "success",
+                "recipe": cached,
+                "cached": True,
+            }
 
     # 2. Call the asynchronous recipe generation function
     try:
         recipe_data = await generate_recipe_from_ingredients(user_ingredients)
-
-        return {
-            "status": "success",
-            "recipe": recipe_data,
-        }
-
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -230,113 +760,14 @@ async def generate_recipe(
             detail=f"An unexpected error occurred during recipe generation: {str(e)}",
         )
 
-
-# --------------------------------------------------------------------
-# ADVANCED LOGIC: INVENTORY CHECK
-# --------------------------------------------------------------------
-
-
-@router.get(
-    "/check-inventory",
-    response_model=List[schemas.InventoryCheckResponse],
-    summary="Identify which recipes can be made with the current inventory",
-)
-def check_recipes_feasibility(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_active_user),
-):
-    """
-    Check which recipes are feasible for the user given their current inventory.
-    """
-
-    # 1. Retrieve the user's inventory
-    # INTEGRITY FIX: Use 'owner_id' instead of 'user_id'
-    inventory = (
-        db.query(models.Ingredient)
-        .filter(models.Ingredient.owner_id == current_user.id)
-        .all()
-    )
-
-    inventory_map = {ing.name.lower(): ing for ing in inventory}
-
-    # 2. Retrieve all accessible recipes
-    recipes = (
-        db.query(models.Recipe)
-        .filter(
-            or_(
-                models.Recipe.owner_id == current_user.id,
-                models.Recipe.is_public == True,
-            )
-        )
-        .all()
-    )
-
-    results = []
-
-    for recipe in recipes:
-        can_make = True
-        missing_items = []
-        available_items = []
-
-        # 3. Check each required ingredient
-        for req_ing in recipe.required_ingredients:
-            req_name = req_ing.name.lower()
-            inv_item = inventory_map.get(req_name)
-
-            # Context for the required ingredient (dict format for the response schema)
-            req_data = {
-                "name": req_ing.name,
-                "quantity": req_ing.quantity,
-                "unit": req_ing.unit,
-            }
-
-            if not inv_item:
-                # Required ingredient not found
-                can_make = False
-                missing_items.append({**req_data, "reason": "Missing entirely"})
-                continue
-
-            # Ingredient is present
-            inv_quantity = inv_item.quantity
-            inv_unit = inv_item.unit
-
-            # 4. Check quantity and unit
-            # Simple logic: must match both unit AND have sufficient quantity
-            if (
-                inv_unit.lower() == req_ing.unit.lower()
-                and inv_quantity >= req_ing.quantity
-            ):
-                # Sufficient quantity and same unit
-                available_items.append(
-                    {
-                        "name": inv_item.name,
-                        "quantity": inv_quantity,
-                        "unit": inv_unit,
-                    }
-                )
-                continue
-            else:
-                # Different unit OR insufficient quantity
-                can_make = False
-
-                # Add to missing items with detailed reason
-                missing_items.append(
-                    {
-                        **req_data,
-                        "available_quantity": inv_quantity,
-                        "available_unit": inv_unit,
-                        "reason": "Insufficient quantity or unit mismatch",
-                    }
-                )
-
-        # 5. Append the result
-        results.append(
-            schemas.InventoryCheckResponse(
-                recipe_id=recipe.id,
-                can_make=can_make,
-                missing_items=missing_items,
-                available_items=available_items,
-            )
-        )
-
-    return results
+    # 3. Cache it (short transaction of its own); a cache failure is not fatal
+    try:
+        await run_in_threadpool(generation_cache.put, cache_key, recipe_data)
+    except SQLAlchemyError:
+        logger.warning("Could not store the generated recipe in the cache", exc_info=True)
+
+    return {
+        "status": "success",
+        "recipe": recipe_data,
+        "cached": False,
+    }
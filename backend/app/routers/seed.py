@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 
 from .. import models, auth
 from ..database import get_db
+from ..crud import recipe_dedupe, recipe_similarity
+from ..crud.feasibility_cache import feasibility_cache
+from ..crud.public_recipe_cache import recipes_changed
 from ..seed_data import (
     create_service_user,
     seed_ingredients,
@@ -30,6 +33,10 @@ def seed_for_service_user(db: Session = Depends(get_db)):
     seed_ingredients(db, owner_id)
     seed_recipes(db, owner_id)
     seed_shopping_lists(db, owner_id)
+    feasibility_cache.invalidate()
+    recipe_similarity.index_missing(db)
+    recipe_dedupe.fingerprint_missing(db, flag=True)
+    recipes_changed(db)
 
     return {
         "message": f"All sample data seeded successfully for seed_user (ID {owner_id})"
@@ -46,6 +53,10 @@ def seed_for_current_user(
     """
     # Utilise la fonction utilitaire qui ouvre sa propre SessionLocal
     run_seed_for_user(current_user.id)
+    feasibility_cache.invalidate()
+    recipe_similarity.index_missing(db)
+    recipe_dedupe.fingerprint_missing(db, flag=True)
+    recipes_changed(db)
 
     return {
         "message": f"Sample data seeded successfully for current user (ID {current_user.id})"
@@ -1,24 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
 from .. import models, schemas, auth
 from ..database import get_db
+from ..utils.etag import etag_matches, make_etag, not_modified, set_etag
 from ..auth import get_current_active_user  # Auth dependency (required)
 
 router = APIRouter(prefix="/shopping-lists", tags=["shopping-lists"])
 
+
+def _lists_stamp(db: Session, user_id: int, list_id: Optional[int] = None):
+    """
+    (list count, max list updated_at, item count, max item updated_at) for the
+    user's lists, or for one list: a single aggregate query used as ETag input.
+    """
+    lists = models.ShoppingList
+    items = models.ShoppingItem
+    stmt = (
+        select(
+            func.count(func.distinct(lists.id)),
+            func.max(lists.updated_at),
+            func.count(items.id),
+            func.max(items.updated_at),
+        )
+        .select_from(lists)
+        .outerjoin(items, items.shopping_list_id == lists.id)
+        .filter(lists.owner_id == user_id)
+    )
+    if list_id is not None:
+        stmt = stmt.filter(lists.id == list_id)
+    return db.execute(stmt).one()
+
 # --- Shopping Lists (CRUD) ---
 
 
 @router.get("/", response_model=List[schemas.ShoppingList])
 def get_shopping_lists(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     """
     Get all shopping lists for the current authenticated user.
+    Supports If-None-Match (304 when no list or item changed).
     """
+    etag = make_etag("shopping-lists", current_user.id, *_lists_stamp(db, current_user.id))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+
     # ISOLATION: filter by owner_id (data isolation)
     return (
         db.query(models.ShoppingList)
@@ -31,12 +64,22 @@ def get_shopping_lists(
 @router.get("/{list_id}", response_model=schemas.ShoppingList)
 def get_shopping_list(
     list_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user),
 ):
     """
     Get a specific shopping list for the current authenticated user.
+    Supports If-None-Match (304 when the list and its items did not change).
     """
+    stamp = _lists_stamp(db, current_user.id, list_id)
+    if stamp[0]:  # unknown / foreign lists fall through to the 404 below
+        etag = make_etag("shopping-list", current_user.id, list_id, *stamp)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        set_etag(response, etag)
+
     shopping_list = (
         db.query(models.ShoppingList)
         .filter(
@@ -80,6 +80,7 @@ class IngredientUpdate(BaseModel):
 class Ingredient(IngredientBase):
     id: int
     owner_id: int
+    catalog_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
 
@@ -102,9 +103,15 @@ class RecipeIngredientCreate(RecipeIngredientBase):
     pass
 
 
+class RecipeIngredientUpdate(RecipeIngredientBase):
+    """Desired ingredient in PUT /recipes/{id}; `id` targets an existing row."""
+    id: Optional[int] = None
+
+
 class RecipeIngredient(RecipeIngredientBase):
     id: int
     recipe_id: int
+    catalog_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -141,18 +148,63 @@ class RecipeUpdate(BaseModel):
     calories: Optional[int] = Field(None, ge=0)
     is_healthy: Optional[bool] = None
     is_public: Optional[bool] = None
+    # Full desired ingredient list (omit to keep the current one)
+    required_ingredients: Optional[List[RecipeIngredientUpdate]] = None
+
+
+class RecipeSummary(BaseModel):
+    """Grid/list view of a recipe: no instructions, no ingredient list."""
+    id: int
+    owner_id: int
+    title: str
+    description: Optional[str] = None
+    prep_time: Optional[int] = None
+    cook_time: Optional[int] = None
+    servings: Optional[int] = None
+    calories: Optional[int] = None
+    is_healthy: Optional[bool] = None
+    is_public: Optional[bool] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SimilarRecipe(RecipeSummary):
+    """Entry of GET /recipes/{id}/similar (similarity: estimated Jaccard, 0..1)."""
+    similarity: float
 
 
 class RecipeOut(RecipeBase):
     id: int
     owner_id: int
     created_at: datetime
+    # Older recipe this one is a near-duplicate of (app/crud/recipe_dedupe.py)
+    duplicate_of_id: Optional[int] = None
     required_ingredients: List[RecipeIngredient] = []
 
     class Config:
         from_attributes = True
 
 
+class BulkImportError(BaseModel):
+    line: int
+    detail: str
+
+
+class BulkImportResult(BaseModel):
+    """Outcome of POST /recipes/bulk (line numbers are 1-based)."""
+    created: int
+    failed: int
+    # Lines skipped as exact duplicates (of the owner's recipes or earlier lines)
+    skipped: int = 0
+    # True when the body had more than recipe_import.MAX_LINES lines: the rest was not read
+    truncated: bool = False
+    recipe_ids: List[int] = []
+    errors: List[BulkImportError] = []
+    duplicates: List[BulkImportError] = []
+
+
 class InventoryCheckResponse(BaseModel):
     recipe_id: int
     can_make: bool
@@ -163,6 +215,32 @@ class InventoryCheckResponse(BaseModel):
         from_attributes = True
 
 
+class InventoryCheckBatchRequest(BaseModel):
+    recipe_ids: List[int] = Field(..., min_length=1, max_length=50)
+
+
+class InventoryCheckSummary(BaseModel):
+    """Lightweight feasibility row computed entirely in PostgreSQL."""
+    recipe_id: int
+    can_make: bool
+    have_count: int
+    need_count: int
+    shortfalls: List[dict]
+
+
+class RankedRecipe(InventoryCheckResponse):
+    """Feasibility result enriched with the "cook now" ranking."""
+    title: str
+    score: float
+    coverage: float
+    urgency: float
+
+
+class RankedRecipePage(BaseModel):
+    items: List[RankedRecipe]
+    next_cursor: Optional[str] = None
+
+
 # ============================================================
 # SHOPPING LIST SCHEMAS
 # ============================================================
@@ -188,8 +266,10 @@ class ShoppingItemUpdate(BaseModel):
 class ShoppingItem(ShoppingItemBase):
     id: int
     shopping_list_id: int
+    catalog_id: Optional[int] = None
     is_purchased: bool
     created_at: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
@@ -207,6 +287,7 @@ class ShoppingList(ShoppingListBase):
     id: int
     owner_id: int
     created_at: datetime
+    updated_at: Optional[datetime] = None
     items: List[ShoppingItem] = []
 
     class Config:
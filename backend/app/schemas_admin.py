@@ -32,6 +32,43 @@ class UserStats(BaseModel):
     new_users_this_month: int
 
 
+class CacheStats(BaseModel):
+    """Hit / miss counters of an in-process cache (current worker only)."""
+    entries: int
+    hits: int
+    misses: int
+    hit_ratio: float
+
+
+class HttpClientStats(BaseModel):
+    """Connection reuse of a pooled HTTP client (current worker only)."""
+    requests: int
+    connections_opened: int
+    connections_reused: int
+    reuse_ratio: float
+    http2_responses: int
+    http2_enabled: bool
+
+
+class EventLoopStats(BaseModel):
+    """Event-loop lag of the current worker (see app/utils/loop_monitor.py)."""
+    samples: int
+    stalls: int
+    last_ms: float
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class SingleFlightStats(BaseModel):
+    """Coalescing of identical concurrent upstream calls (current worker only)."""
+    calls: int
+    upstream_calls: int
+    coalesced: int
+    coalesced_ratio: float
+    in_flight: int
+
+
 # --------------------------------------------------------------------
 # Landing content (CMS)
 # --------------------------------------------------------------------
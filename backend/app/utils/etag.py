@@ -0,0 +1,47 @@
+"""
+Weak ETags for conditional GET.
+
+ETags are derived from cheap "stamps" (row count + max(updated_at)) read
+before any row is hydrated. When the client's If-None-Match matches, the
+endpoint answers 304 without loading or serializing anything.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+# Browsers must revalidate every time (the data is per user)
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """W/"<digest>" built from the resource name, owner and stamp values."""
+    raw = "|".join("" if part is None else str(part) for part in parts)
+    return 'W/"%s"' % hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Weak comparison of `etag` against the request's If-None-Match header."""
+    header = request.headers.get("if-none-match")
+    if not header or not etag:
+        return False
+    if header.strip() == "*":
+        return True
+    return _opaque(etag) in {_opaque(tag) for tag in header.split(",")}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,104 @@
+"""
+Long-lived, pooled httpx.AsyncClient (one per gunicorn worker).
+
+Creating a client per call throws its connection pool away, so every call
+pays a new TCP + TLS handshake. A PooledAsyncClient is opened at startup and
+closed at shutdown (main.py); in between, connections are kept alive and
+reused, over HTTP/2 when the optional `h2` package is installed
+(`httpx[http2]`), which multiplexes concurrent calls on one connection.
+
+Connection reuse is observable: the httpcore trace extension reports every
+new TCP connection, so `stats()` can tell opened from reused connections.
+"""
+import logging
+import threading
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=60.0,
+)
+
+
+class PooledAsyncClient:
+    def __init__(
+        self,
+        name: str,
+        timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+        limits: httpx.Limits = DEFAULT_LIMITS,
+        http2: bool = True,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.limits = limits
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.requests = 0
+        self.connections_opened = 0
+        self.http2_responses = 0
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    # --- Lifecycle -----------------------------------------------------
+
+    def start(self) -> None:
+        """Create the client (idempotent). No connection is opened yet."""
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                self._client = httpx.AsyncClient(
+                    timeout=self.timeout,
+                    limits=self.limits,
+                    http2=self.http2,
+                    event_hooks={"request": [self._on_request], "response": [self._on_response]},
+                )
+                logger.info("HTTP client %s started (http2=%s)", self.name, self.http2)
+
+    async def aclose(self) -> None:
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client; created on first use outside the app (scripts, shell)."""
+        if self._client is None or self._client.is_closed:
+            self.start()
+        return self._client
+
+    # --- Metrics -------------------------------------------------------
+
+    async def _trace(self, event_name: str, info: dict) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.connections_opened += 1
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        if response.http_version == "HTTP/2":
+            self.http2_responses += 1
+
+    def stats(self) -> dict:
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": reused,
+            "reuse_ratio": reused / self.requests if self.requests else 0.0,
+            "http2_responses": self.http2_responses,
+            "http2_enabled": self.http2,
+        }
@@ -0,0 +1,79 @@
+"""
+Event-loop lag monitor (one per gunicorn worker).
+
+A background task sleeps INTERVAL seconds in a loop and records how late it
+wakes up. Any blocking call made on the event loop (sync DB query, sync HTTP
+call, CPU-heavy work in an `async def` endpoint) delays every coroutine of
+the worker, and shows up here as lag of the same size.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = 0.5
+# Recent samples kept for the percentiles (10 minutes at INTERVAL)
+WINDOW = 1200
+# Lag above this is logged and counted as a stall
+STALL_SECONDS = 0.1
+
+
+class EventLoopLagMonitor:
+    def __init__(self, interval: float = INTERVAL, window: int = WINDOW):
+        self.interval = interval
+        self.samples = 0
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop (call from an async startup hook)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(time.perf_counter() - expected, 0.0))
+
+    def record(self, lag: float) -> None:
+        self.samples += 1
+        self._recent.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        if lag >= STALL_SECONDS:
+            self.stalls += 1
+            logger.warning("Event loop blocked for %.0f ms", lag * 1000)
+
+    def stats(self) -> dict:
+        recent = sorted(self._recent)
+
+        def percentile(q: float) -> float:
+            if not recent:
+                return 0.0
+            return recent[min(int(q * len(recent)), len(recent) - 1)] * 1000
+
+        return {
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "last_ms": self._recent[-1] * 1000 if self._recent else 0.0,
+            "p50_ms": percentile(0.50),
+            "p99_ms": percentile(0.99),
+            "max_ms": self.max_lag * 1000,
+        }
+
+
+loop_monitor = EventLoopLagMonitor()
@@ -0,0 +1,73 @@
+"""
+MinHash signatures and LSH band keys.
+
+A signature keeps, for NUM_PERM universal hash functions
+h(x) = (a * x + b) mod (2^31 - 1), the minimum over the tokens of a set; the
+fraction of equal positions between two signatures estimates the Jaccard
+similarity of the sets.
+
+For candidate lookup the signature is cut into BANDS bands of ROWS values and
+each band is hashed to a 64-bit key: two sets share at least one key with
+probability 1 - (1 - J^ROWS)^BANDS (about 0.5 at J = 0.15, 0.95 at J = 0.3).
+
+The hash parameters come from a fixed seed: signatures are persisted, so
+changing NUM_PERM / BANDS / SEED requires re-indexing.
+"""
+import hashlib
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+PRIME = (1 << 31) - 1
+NUM_PERM = 64
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SEED = 1729
+
+_rng = np.random.RandomState(SEED)
+_A = _rng.randint(1, PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+_B = _rng.randint(0, PRIME, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+DTYPE = np.dtype("<u4")
+
+
+def text_token(text: str) -> int:
+    """Stable 32-bit token for a string (Python's hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def signature(tokens: Iterable[int]) -> Optional[np.ndarray]:
+    """MinHash signature of a set of non-negative integer tokens (None if empty)."""
+    values = np.fromiter({token % PRIME for token in tokens}, dtype=np.uint64)
+    if not len(values):
+        return None
+    # a, x < 2^31: the products fit in 64 bits
+    return ((np.outer(values, _A) + _B) % PRIME).min(axis=0).astype(DTYPE)
+
+
+def band_keys(sig: np.ndarray) -> List[int]:
+    """BANDS signed 64-bit keys (BIGINT-compatible), one per band."""
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                band.to_bytes(2, "little") + sig[band * ROWS:(band + 1) * ROWS].tobytes(),
+                digest_size=8,
+            ).digest(),
+            "little",
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def to_bytes(sig: Optional[np.ndarray]) -> bytes:
+    return b"" if sig is None else sig.astype(DTYPE).tobytes()
+
+
+def from_bytes(raw: bytes) -> Optional[np.ndarray]:
+    return np.frombuffer(raw, dtype=DTYPE) if raw else None
+
+
+def similarity(sig: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of `sig` against each row of `others`."""
+    return (others == sig).mean(axis=1)
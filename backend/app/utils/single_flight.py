@@ -0,0 +1,51 @@
+"""
+Single-flight coalescing of identical concurrent calls (one per gunicorn worker).
+
+While a call for a key is in flight, later callers with the same key do not
+start their own: they await the first one and get the same result (or the
+same exception). The entry is dropped as soon as the call finishes, so this
+is not a cache: a caller arriving afterwards starts a new call.
+
+The shared call is shielded: a caller that goes away (client disconnect,
+timeout) does not cancel it for the others still waiting.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.upstream_calls = 0
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        """Result of `call()`, shared with every concurrent caller of `key`."""
+        self.calls += 1
+        future = self._in_flight.get(key)
+        if future is None:
+            self.upstream_calls += 1
+            future = asyncio.ensure_future(call())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda done: self._finished(key, done))
+        return await asyncio.shield(future)
+
+    def _finished(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+        # Mark the exception as retrieved even if every caller went away
+        if not future.cancelled():
+            future.exception()
+
+    def stats(self) -> dict:
+        coalesced = self.calls - self.upstream_calls
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": coalesced,
+            "coalesced_ratio": coalesced / self.calls if self.calls else 0.0,
+            "in_flight": len(self._in_flight),
+        }
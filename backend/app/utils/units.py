@@ -0,0 +1,72 @@
+"""
+Canonical unit registry.
+
+Every known alias resolves to one base unit per dimension with a precomputed
+conversion factor:
+    mass   -> "g"
+    volume -> "ml"
+    count  -> "pcs"
+
+Unknown units are kept as-is (lowercased) and only match themselves.
+"""
+from typing import Dict, Tuple
+
+MASS = "g"
+VOLUME = "ml"
+COUNT = "pcs"
+
+# base unit, factor, aliases
+_UNIT_DEFINITIONS = [
+    # --- Mass ---
+    (MASS, 1.0, ["g", "gr", "gram", "grams", "gramme", "grammes"]),
+    (MASS, 1000.0, ["kg", "kgs", "kilo", "kilos", "kilogram", "kilograms", "kilogramme", "kilogrammes"]),
+    (MASS, 0.001, ["mg", "milligram", "milligrams"]),
+    (MASS, 453.59237, ["lb", "lbs", "pound", "pounds"]),
+    (MASS, 28.349523125, ["oz", "ounce", "ounces"]),
+    # --- Volume ---
+    (VOLUME, 1.0, ["ml", "milliliter", "milliliters", "millilitre", "millilitres"]),
+    (VOLUME, 10.0, ["cl", "centiliter", "centiliters", "centilitre", "centilitres"]),
+    (VOLUME, 100.0, ["dl", "deciliter", "deciliters", "decilitre", "decilitres"]),
+    (VOLUME, 1000.0, ["l", "liter", "liters", "litre", "litres"]),
+    (VOLUME, 5.0, ["tsp", "teaspoon", "teaspoons"]),
+    (VOLUME, 15.0, ["tbsp", "tablespoon", "tablespoons"]),
+    (VOLUME, 240.0, ["cup", "cups"]),
+    # --- Count ---
+    (COUNT, 1.0, ["pcs", "pc", "piece", "pieces", "unit", "units", "x"]),
+    (COUNT, 12.0, ["dozen", "dozens"]),
+]
+
+# alias -> (base unit, factor), built once at import
+UNIT_REGISTRY: Dict[str, Tuple[str, float]] = {
+    alias: (base, factor)
+    for base, factor, aliases in _UNIT_DEFINITIONS
+    for alias in aliases
+}
+
+
+def clean_unit(unit: str) -> str:
+    """Lowercase / strip a free-text unit ("Kg." -> "kg")."""
+    return (unit or "").strip().lower().rstrip(".")
+
+
+def resolve_unit(unit: str) -> Tuple[str, float]:
+    """Return (base unit, factor) for a unit; unknown units map to themselves."""
+    cleaned = clean_unit(unit)
+    return UNIT_REGISTRY.get(cleaned, (cleaned, 1.0))
+
+
+def to_base(quantity: float, unit: str) -> Tuple[float, str]:
+    """Convert a quantity into its base unit: (2, "kg") -> (2000.0, "g")."""
+    base, factor = resolve_unit(unit)
+    return quantity * factor, base
+
+
+def from_base(base_quantity: float, unit: str) -> float:
+    """Express a base quantity in `unit`: (2000.0, "kg") -> 2.0."""
+    _, factor = resolve_unit(unit)
+    return base_quantity / factor
+
+
+def same_dimension(unit_a: str, unit_b: str) -> bool:
+    """True if both units convert to the same base unit."""
+    return resolve_unit(unit_a)[0] == resolve_unit(unit_b)[0]
@@ -0,0 +1,101 @@
+# bench_feasibility.py
+# Microbenchmark : scoring Python (boucles) vs matrice NumPy (vectorisé)
+# pour 1k / 10k / 100k recettes publiques synthétiques.
+# Aucune base de données nécessaire. A exécuter dans le dossier backend :
+#     python bench_feasibility.py
+
+import random
+import time
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from app.crud.feasibility import Inventory, score_recipe
+from app.crud.feasibility_matrix import CatalogMatrix
+
+SIZES = [1_000, 10_000, 100_000]
+VOCABULARY = 2_000        # ingrédients distincts dans le catalogue
+INVENTORY_SIZE = 40       # ingrédients dans le frigo de l'utilisateur
+UNITS = ["g", "ml", "pcs"]
+REPEAT = 5
+
+
+def make_catalog(n_recipes: int, rng: random.Random):
+    """Lignes (recipe_id, catalog_id, base_unit, base_quantity) triées par recette."""
+    rows = []
+    for recipe_id in range(1, n_recipes + 1):
+        for idx in rng.sample(range(VOCABULARY), rng.randint(4, 10)):
+            rows.append((recipe_id, idx, UNITS[idx % 3], float(rng.randint(1, 500))))
+    return rows
+
+
+def make_inventory(rng: random.Random, today: date) -> Inventory:
+    rows = []
+    for idx in rng.sample(range(VOCABULARY // 10), INVENTORY_SIZE):
+        rows.append(
+            SimpleNamespace(
+                catalog_id=idx,
+                quantity=float(rng.randint(1, 1000)),
+                unit=UNITS[idx % 3],
+                base_quantity=None,
+                base_unit=None,
+                expiry_date=today + timedelta(days=rng.randint(0, 14)),
+            )
+        )
+    return Inventory(rows)
+
+
+def python_path(grouped, inventory, today):
+    """Chemin historique : boucle Python recette par recette."""
+    results = {}
+    for recipe_id, required in grouped.items():
+        if any(inventory.has(req.catalog_id) for req in required):
+            results[recipe_id] = score_recipe(required, inventory, today)
+    return results
+
+
+def best_of(fn):
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main() -> None:
+    rng = random.Random(42)
+    today = date.today()
+    inventory = make_inventory(rng, today)
+
+    print(f"{'recipes':>8} | {'python (ms)':>11} | {'numpy (ms)':>10} | {'speedup':>7} | {'build (ms)':>10}")
+    print("-" * 60)
+
+    for n_recipes in SIZES:
+        rows = make_catalog(n_recipes, rng)
+
+        grouped = {}
+        for recipe_id, catalog_id, unit, quantity in rows:
+            grouped.setdefault(recipe_id, []).append(
+                SimpleNamespace(catalog_id=catalog_id, quantity=quantity, unit=unit, base_quantity=quantity, base_unit=unit)
+            )
+
+        start = time.perf_counter()
+        matrix = CatalogMatrix(rows)
+        build = time.perf_counter() - start
+
+        py_time, py_results = best_of(lambda: python_path(grouped, inventory, today))
+        np_time, np_scores = best_of(lambda: matrix.score(inventory, today))
+
+        # Contrôle : les deux chemins donnent les mêmes scores
+        assert len(py_results) == len(np_scores)
+        for recipe_id, score in zip(np_scores.recipe_ids.tolist(), np_scores.score.tolist()):
+            assert abs(py_results[recipe_id][0] - score) < 1e-9
+
+        print(
+            f"{n_recipes:>8} | {py_time * 1000:>11.2f} | {np_time * 1000:>10.2f} | "
+            f"{py_time / np_time:>6.1f}x | {build * 1000:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()